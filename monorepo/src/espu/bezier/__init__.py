@@ -1,3 +1,9 @@
 from .curve import CubicBezierCurve, QuadraticBezierCurve, LinearBezierCurve
 from espu.lib.vector import Vec2
-from .exceptions import CurveNotBakedError
\ No newline at end of file
+from .exceptions import CurveNotBakedError
+
+# CubicBezierBatch needs NumPy which is an optional dependency
+try:
+    from .batch import CubicBezierBatch
+except ImportError:
+    CubicBezierBatch = None
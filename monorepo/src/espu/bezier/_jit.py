@@ -0,0 +1,64 @@
+# Optional Numba kernel for the bezier hot path.
+#
+# When Numba is installed batched cubic evaluation runs through this
+# compiled function instead of NumPy temporaries. Importing Numba and
+# loading the kernel takes noticeably longer than importing the
+# package, so nothing happens until the first call that can use it. The
+# kernel is given an explicit signature so it is compiled (or loaded
+# from the on-disk cache) once at that point rather than per call type.
+# Without Numba the accessor returns None and the caller uses its NumPy
+# path.
+
+# NumPy is already imported by the callers, the kernels refer to it as
+# a module global so Numba can cache them on disk
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# None until the first use, False if Numba is not installed
+_kernels = None
+
+
+def _load():
+    global _kernels
+    if _kernels is not None:
+        return _kernels
+
+    try:
+        from numba import njit
+    except ImportError:
+        _kernels = False
+        return _kernels
+
+    # P: (4, 2) array of control points, ts: parameters to evaluate.
+    # Bernstein form in Horner nesting, one fused loop per point and no
+    # temporaries. Returns the x and y columns.
+    @njit(
+        "Tuple((float64[:], float64[:]))(float64[:, :], float64[:])",
+        fastmath=True,
+        cache=True,
+    )
+    def cubic_resolve_array(P, ts):
+        n = ts.shape[0]
+        xs = np.empty(n)
+        ys = np.empty(n)
+        x1, x2, x3, x4 = P[0, 0], 3.0 * P[1, 0], 3.0 * P[2, 0], P[3, 0]
+        y1, y2, y3, y4 = P[0, 1], 3.0 * P[1, 1], 3.0 * P[2, 1], P[3, 1]
+        for i in range(n):
+            t = ts[i]
+            u = 1.0 - t
+            tt = t * t
+            ttt = tt * t
+            xs[i] = ((x1 * u + x2 * t) * u + x3 * tt) * u + x4 * ttt
+            ys[i] = ((y1 * u + y2 * t) * u + y3 * tt) * u + y4 * ttt
+        return xs, ys
+
+    _kernels = (cubic_resolve_array,)
+    return _kernels
+
+
+# Compiled batched cubic evaluation, or None without Numba
+def cubic_resolve_kernel():
+    kernels = _load()
+    return kernels[0] if kernels else None
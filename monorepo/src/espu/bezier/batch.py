@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Iterable, Tuple
+import numpy as np
+
+from .curve import CubicBezierCurve
+
+
+# Many cubic curves stored as a structure of arrays.
+# xs and ys hold the control point coordinates with shape (N, 4), one row
+# per curve. Evaluating every curve at the same parameters is then a
+# single matrix product with the Bernstein basis instead of a Python loop
+# over curves and points. Callers rendering many path segments should
+# convert once with from_curves and evaluate in one call.
+class CubicBezierBatch:
+    __slots__ = ("xs", "ys")
+
+    def __init__(self, xs, ys):
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+
+    @classmethod
+    def from_curves(cls, curves: Iterable[CubicBezierCurve]) -> CubicBezierBatch:
+        xs = []
+        ys = []
+        for c in curves:
+            xs.append((c.P1.x, c.P2.x, c.P3.x, c.P4.x))
+            ys.append((c.P1.y, c.P2.y, c.P3.y, c.P4.y))
+        return cls(
+            np.array(xs, dtype=np.float64).reshape(-1, 4),
+            np.array(ys, dtype=np.float64).reshape(-1, 4),
+        )
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    # Bernstein basis for a 1-D parameter array, shape (M, 4)
+    @staticmethod
+    def basis(ts) -> np.ndarray:
+        ts = np.asarray(ts, dtype=np.float64)
+        u = 1.0 - ts
+        uu = u * u
+        tt = ts * ts
+        return np.stack((uu * u, 3.0 * uu * ts, 3.0 * u * tt, tt * ts), axis=1)
+
+    # Returns the x and y coordinates with shape (M, N): row i holds every
+    # curve evaluated at ts[i], column j is curve j across all of ts.
+    def evaluate(self, ts) -> Tuple[np.ndarray, np.ndarray]:
+        B = self.basis(ts)
+        return B @ self.xs.T, B @ self.ys.T
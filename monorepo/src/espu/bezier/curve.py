@@ -1,13 +1,21 @@
-from espu.lib.vector import Vec2
+import math
+from espu.lib.vector import Vec2, Vec2Array
 from .utils import (
     quadratic_roots,
     curvature_from_derivatives,
-    lerp,
-    t_at_arc_length,
-    build_arc_table,
+    bernstein_batch,
+    t_at_arc_length_refined,
+    build_arc_table_quadrature,
 )
 from typing import Tuple
 from .exceptions import CurveNotBakedError
+from ._jit import cubic_resolve_kernel
+
+# NumPy is optional and only needed for resolve_batch
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 # According to the Bernstein Polynomial Form
@@ -18,15 +26,22 @@ class LinearBezierCurve:
         self.P2 = P2
 
     def resolve(self, t: float) -> Vec2:
-        return lerp(self.P1, self.P2, t)
+        P1, P2 = self.P1, self.P2
+        return Vec2(P1.x + (P2.x - P1.x) * t, P1.y + (P2.y - P1.y) * t)
+
+    def resolve_batch(self, ts) -> Vec2Array:
+        # Requires NumPy. ts is a 1-D array or sequence of parameters.
+        ts = np.asarray(ts, dtype=np.float64)
+        return bernstein_batch((1.0 - ts, ts), (self.P1, self.P2))
 
     def derivative(self) -> Vec2:
         return self.P2 - self.P1
 
     def bounding_box(self) -> Tuple[float, float, float, float]:
-        xs = [self.P1.x, self.P2.x]
-        ys = [self.P1.y, self.P2.y]
-        return min(xs), min(ys), max(xs), max(ys)
+        P1, P2 = self.P1, self.P2
+        minx, maxx = (P1.x, P2.x) if P1.x <= P2.x else (P2.x, P1.x)
+        miny, maxy = (P1.y, P2.y) if P1.y <= P2.y else (P2.y, P1.y)
+        return minx, miny, maxx, maxy
 
 
 class QuadraticBezierCurve:
@@ -35,16 +50,103 @@ class QuadraticBezierCurve:
         self.P2 = P2
         self.P3 = P3
         self._baked = False
-
-    def resolve(self, t: float) -> Vec2:
-        u = 1.0 - t
-        return self.P1 * (u * u) + self.P2 * (2 * u * t) + self.P3 * (t * t)
+        self._d1 = None
+        self._d2 = None
+        self._coeffs = None
+
+    # Derivatives and power basis coefficients are cached on first use,
+    # so the control points are treated as immutable. Code that does
+    # replace P1..P3 afterwards must call _invalidate() (and bake() again
+    # for resolve_uniform).
+    def _invalidate(self):
+        self._d1 = None
+        self._d2 = None
+        self._coeffs = None
+
+    # B(t) = a t^2 + b t + c as flat floats (ax, ay, bx, by, cx, cy)
+    def _power_basis(self):
+        P1, P2, P3 = self.P1, self.P2, self.P3
+        coeffs = self._coeffs = (
+            P1.x - 2 * P2.x + P3.x,
+            P1.y - 2 * P2.y + P3.y,
+            2 * (P2.x - P1.x),
+            2 * (P2.y - P1.y),
+            P1.x,
+            P1.y,
+        )
+        return coeffs
+
+    def resolve(self, t: float, stable: bool = False) -> Vec2:
+        if stable:
+            # Bernstein weights, no cancellation between large terms
+            u = 1.0 - t
+            a = u * u
+            b = 2 * u * t
+            c = t * t
+            P1, P2, P3 = self.P1, self.P2, self.P3
+            return Vec2(
+                P1.x * a + P2.x * b + P3.x * c, P1.y * a + P2.y * b + P3.y * c
+            )
+
+        # Horner rounds differently from the Bernstein form, return the
+        # end point itself so resolve(1.0) is exactly P3. At t = 0 the
+        # power basis already gives P1 exactly.
+        if t == 1.0:
+            P3 = self.P3
+            return Vec2(float(P3.x), float(P3.y))
+
+        # Horner on the power basis, fewest operations per point
+        coeffs = self._coeffs
+        if coeffs is None:
+            coeffs = self._power_basis()
+        ax, ay, bx, by, cx, cy = coeffs
+        return Vec2((ax * t + bx) * t + cx, (ay * t + by) * t + cy)
+
+    def resolve_batch(self, ts) -> Vec2Array:
+        # Requires NumPy. ts is a 1-D array or sequence of parameters.
+        # Same Horner scheme as resolve, updated in place so each axis
+        # allocates a single array.
+        ts = np.asarray(ts, dtype=np.float64)
+        coeffs = self._coeffs
+        if coeffs is None:
+            coeffs = self._power_basis()
+        ax, ay, bx, by, cx, cy = coeffs
+        # out= keeps a 0-d input an array, ts * ax would be a scalar
+        xs = np.multiply(ts, ax, out=np.empty_like(ts))
+        xs += bx
+        xs *= ts
+        xs += cx
+        ys = np.multiply(ts, ay, out=np.empty_like(ts))
+        ys += by
+        ys *= ts
+        ys += cy
+        # Pin t = 1 to P3 exactly, like resolve
+        end = ts == 1.0
+        if end.any():
+            xs[end] = self.P3.x
+            ys[end] = self.P3.y
+        return Vec2Array(xs, ys)
 
     def derivative(self) -> LinearBezierCurve:
-        return LinearBezierCurve(2 * (self.P2 - self.P1), 2 * (self.P3 - self.P2))
+        d1 = self._d1
+        if d1 is None:
+            d1 = self._d1 = LinearBezierCurve(
+                2 * (self.P2 - self.P1), 2 * (self.P3 - self.P2)
+            )
+        return d1
+
+    def second_derivative(self) -> Vec2:
+        d2 = self._d2
+        if d2 is None:
+            d2 = self._d2 = self.derivative().derivative()
+        return d2
 
     def bounding_box(self) -> Tuple[float, float, float, float]:
-        points = [self.resolve(0.0), self.resolve(1.0)]
+        # The curve passes through its end points exactly
+        P1, Pn = self.P1, self.P3
+        x0, y0, x1, y1 = float(P1.x), float(P1.y), float(Pn.x), float(Pn.y)
+        minx, maxx = (x0, x1) if x0 <= x1 else (x1, x0)
+        miny, maxy = (y0, y1) if y0 <= y1 else (y1, y0)
 
         # derivative is linear
         d = self.derivative()
@@ -56,33 +158,75 @@ class QuadraticBezierCurve:
             t = a / denom
             return t if 0.0 < t < 1.0 else None
 
+        # An extremum on one axis can only widen that axis, the other
+        # coordinate of the point already lies within the range.
         tx = axis_root(d.P1.x, d.P2.x)
-        ty = axis_root(d.P1.y, d.P2.y)
-
         if tx is not None:
-            points.append(self.resolve(tx))
-        if ty is not None:
-            points.append(self.resolve(ty))
+            x = self.resolve(tx).x
+            if x < minx:
+                minx = x
+            elif x > maxx:
+                maxx = x
 
-        xs = [p.x for p in points]
-        ys = [p.y for p in points]
+        ty = axis_root(d.P1.y, d.P2.y)
+        if ty is not None:
+            y = self.resolve(ty).y
+            if y < miny:
+                miny = y
+            elif y > maxy:
+                maxy = y
 
-        return min(xs), min(ys), max(xs), max(ys)
+        return minx, miny, maxx, maxy
 
     def curvature(self, t: float, d1: LinearBezierCurve, d2: Vec2) -> float:
         v = d1.resolve(t)
         return curvature_from_derivatives(v, d2)
 
+    # Exact arc length from 0 to t.
+    # The speed is the square root of a quadratic in t, so the integral
+    # has a closed form. The log term is written as asinh which stays
+    # stable when the start speed is close to zero.
+    def arc_length_analytic(self, t: float = 1.0) -> float:
+        coeffs = self._coeffs
+        if coeffs is None:
+            coeffs = self._power_basis()
+        Ax, Ay, Bx, By = coeffs[:4]
+
+        # |B'(t)|^2 = a t^2 + b t + c
+        a = 4 * (Ax * Ax + Ay * Ay)
+        b = 4 * (Ax * Bx + Ay * By)
+        c = Bx * Bx + By * By
+
+        # Control points evenly spaced on a line, constant speed
+        if a <= 1e-12 * c:
+            return math.sqrt(c) * t
+
+        u0 = b
+        u1 = 2 * a * t + b
+        q1 = (a * t + b) * t + c
+        s = (u1 * math.sqrt(max(q1, 0.0)) - u0 * math.sqrt(c)) / (4 * a)
+
+        # disc is 0 when all control points are collinear
+        disc = 4 * a * c - b * b
+        if disc > 0.0:
+            r = math.sqrt(disc)
+            k = disc / (8 * a * math.sqrt(a))
+            s += k * (math.asinh(u1 / r) - math.asinh(u0 / r))
+        return s
+
     def bake(self, steps: int = 32):
-        self._arc_table = build_arc_table(self, steps)
-        self._arc_length = self._arc_table[-1][1]
+        # Sample the exact arc length instead of summing chords
+        ts = [i / steps for i in range(steps + 1)]
+        ss = [self.arc_length_analytic(t) for t in ts]
+        self._arc_ts, self._arc_ss = ts, ss
+        self._arc_length = float(ss[-1])
         self._baked = True
 
     def resolve_uniform(self, u: float) -> Vec2:
         if not self._baked:
             raise CurveNotBakedError()
         s = u * self._arc_length
-        t = t_at_arc_length(self, s)
+        t = t_at_arc_length_refined(self, s)
         return self.resolve(t)
 
 
@@ -93,23 +237,109 @@ class CubicBezierCurve:
         self.P3 = P3
         self.P4 = P4
         self._baked = False
+        self._d1 = None
+        self._d2 = None
+        self._coeffs = None
+
+    # Derivatives and power basis coefficients are cached on first use,
+    # so the control points are treated as immutable. Code that does
+    # replace P1..P4 afterwards must call _invalidate() (and bake() again
+    # for resolve_uniform).
+    def _invalidate(self):
+        self._d1 = None
+        self._d2 = None
+        self._coeffs = None
+
+    # B(t) = a t^3 + b t^2 + c t + d as flat floats (ax, ay, ..., dx, dy)
+    def _power_basis(self):
+        P1, P2, P3, P4 = self.P1, self.P2, self.P3, self.P4
+        coeffs = self._coeffs = (
+            -P1.x + 3 * P2.x - 3 * P3.x + P4.x,
+            -P1.y + 3 * P2.y - 3 * P3.y + P4.y,
+            3 * (P1.x - 2 * P2.x + P3.x),
+            3 * (P1.y - 2 * P2.y + P3.y),
+            3 * (P2.x - P1.x),
+            3 * (P2.y - P1.y),
+            P1.x,
+            P1.y,
+        )
+        return coeffs
+
+    def resolve(self, t: float, stable: bool = False) -> Vec2:
+        if stable:
+            # Bernstein weights, no cancellation between large terms
+            u = 1.0 - t
+            u2 = u * u
+            t2 = t * t
+            u3 = u2 * u
+            a = 3 * u2 * t
+            b = 3 * u * t2
+            t3 = t2 * t
+            P1, P2, P3, P4 = self.P1, self.P2, self.P3, self.P4
+            return Vec2(
+                P1.x * u3 + P2.x * a + P3.x * b + P4.x * t3,
+                P1.y * u3 + P2.y * a + P3.y * b + P4.y * t3,
+            )
+
+        # Horner rounds differently from the Bernstein form, return the
+        # end point itself so resolve(1.0) is exactly P4. At t = 0 the
+        # power basis already gives P1 exactly.
+        if t == 1.0:
+            P4 = self.P4
+            return Vec2(float(P4.x), float(P4.y))
+
+        # Horner on the power basis, fewest operations per point
+        coeffs = self._coeffs
+        if coeffs is None:
+            coeffs = self._power_basis()
+        ax, ay, bx, by, cx, cy, dx, dy = coeffs
+        return Vec2(
+            ((ax * t + bx) * t + cx) * t + dx, ((ay * t + by) * t + cy) * t + dy
+        )
 
-    def resolve(self, t: float) -> Vec2:
-        u = 1.0 - t
-        return (
-            self.P1 * (u * u * u)
-            + self.P2 * (3 * u * u * t)
-            + self.P3 * (3 * u * t * t)
-            + self.P4 * (t * t * t)
+    def resolve_batch(self, ts) -> Vec2Array:
+        # Requires NumPy. ts is a 1-D array or sequence of parameters.
+        ts = np.asarray(ts, dtype=np.float64)
+        kernel = cubic_resolve_kernel()
+        if kernel is not None and ts.ndim == 1:
+            # The kernel is compiled for contiguous 1-D float64 only
+            ts = np.ascontiguousarray(ts)
+            P = np.array(
+                [p.to_tuple() for p in (self.P1, self.P2, self.P3, self.P4)],
+                dtype=np.float64,
+            )
+            return Vec2Array(*kernel(P, ts))
+
+        u = 1.0 - ts
+        uu = u * u
+        tt = ts * ts
+        return bernstein_batch(
+            (uu * u, 3.0 * uu * ts, 3.0 * u * tt, tt * ts),
+            (self.P1, self.P2, self.P3, self.P4),
         )
 
     def derivative(self) -> QuadraticBezierCurve:
-        return QuadraticBezierCurve(
-            3 * (self.P2 - self.P1), 3 * (self.P3 - self.P2), 3 * (self.P4 - self.P3)
-        )
+        d1 = self._d1
+        if d1 is None:
+            d1 = self._d1 = QuadraticBezierCurve(
+                3 * (self.P2 - self.P1),
+                3 * (self.P3 - self.P2),
+                3 * (self.P4 - self.P3),
+            )
+        return d1
+
+    def second_derivative(self) -> LinearBezierCurve:
+        d2 = self._d2
+        if d2 is None:
+            d2 = self._d2 = self.derivative().derivative()
+        return d2
 
     def bounding_box(self) -> Tuple[float, float, float, float]:
-        points = [self.resolve(0.0), self.resolve(1.0)]
+        # The curve passes through its end points exactly
+        P1, Pn = self.P1, self.P4
+        x0, y0, x1, y1 = float(P1.x), float(P1.y), float(Pn.x), float(Pn.y)
+        minx, maxx = (x0, x1) if x0 <= x1 else (x1, x0)
+        miny, maxy = (y0, y1) if y0 <= y1 else (y1, y0)
 
         d = self.derivative()
 
@@ -118,18 +348,25 @@ class CubicBezierCurve:
         b = 2 * (d.P2 - d.P1)
         c = d.P1
 
+        # An extremum on one axis can only widen that axis, the other
+        # coordinate of the point already lies within the range.
         for t in quadratic_roots(a.x, b.x, c.x):
             if 0.0 < t < 1.0:
-                points.append(self.resolve(t))
+                x = self.resolve(t).x
+                if x < minx:
+                    minx = x
+                elif x > maxx:
+                    maxx = x
 
         for t in quadratic_roots(a.y, b.y, c.y):
             if 0.0 < t < 1.0:
-                points.append(self.resolve(t))
-
-        xs = [p.x for p in points]
-        ys = [p.y for p in points]
+                y = self.resolve(t).y
+                if y < miny:
+                    miny = y
+                elif y > maxy:
+                    maxy = y
 
-        return min(xs), min(ys), max(xs), max(ys)
+        return minx, miny, maxx, maxy
 
     def curvature(
         self, t: float, d1: QuadraticBezierCurve, d2: LinearBezierCurve
@@ -139,13 +376,15 @@ class CubicBezierCurve:
         return curvature_from_derivatives(v, a)
 
     def bake(self, steps: int = 32):
-        self._arc_table = build_arc_table(self, steps)
-        self._arc_length = self._arc_table[-1][1]
+        # Integrated speed rather than chords, resolve_uniform refines
+        # against these lengths
+        self._arc_ts, self._arc_ss = build_arc_table_quadrature(self, steps)
+        self._arc_length = float(self._arc_ss[-1])
         self._baked = True
 
     def resolve_uniform(self, u: float) -> Vec2:
         if not self._baked:
             raise CurveNotBakedError()
         s = u * self._arc_length
-        t = t_at_arc_length(self, s)
+        t = t_at_arc_length_refined(self, s)
         return self.resolve(t)
@@ -1,5 +1,12 @@
 import math
-from espu.lib.vector import Vec2
+from bisect import bisect_left
+from espu.lib.vector import Vec2, Vec2Array
+
+# NumPy is optional. Without it the arc table is built point by point.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def quadratic_roots(a, b, c):
@@ -27,47 +34,129 @@ def curvature_from_derivatives(v: Vec2, a: Vec2) -> float:
     return det(v, a) / (speed**3)
 
 
-def lerp(a, b, t: float):
-    return a + (b - a) * t
-
-
-def build_arc_table(obj, steps: int):
-    table = []
-
-    prev_point = obj.resolve(0.0)
-    length = 0.0
-
-    table.append((0.0, 0.0))
-
-    for i in range(1, steps + 1):
-        t = i / steps
-        point = obj.resolve(t)
-        length += (point - prev_point).length()
-        table.append((t, length))
-        prev_point = point
-
-    return table
-
-
-def t_at_arc_length(obj, s: float) -> float:
-    table = obj._arc_table
+# Sum of weights[i] * points[i] for whole columns of weights (Bernstein
+# basis values over a parameter array). Accumulates in place so only the
+# two output columns and one scratch array are allocated. Requires NumPy.
+def bernstein_batch(weights, points) -> Vec2Array:
+    xs = np.zeros_like(weights[0])
+    ys = np.zeros_like(weights[0])
+    tmp = np.empty_like(xs)
+    for w, p in zip(weights, points):
+        np.multiply(w, p.x, out=tmp)
+        xs += tmp
+        np.multiply(w, p.y, out=tmp)
+        ys += tmp
+    return Vec2Array(xs, ys)
+
+
+# Table lookup shared by t_at_arc_length and t_at_arc_length_refined.
+# Returns (i, t) where ss[i - 1] < s <= ss[i] and t interpolates
+# between ts[i - 1] and ts[i]. i is 0 when s is clamped to either end.
+def _arc_table_lookup(obj, s: float) -> tuple[int, float]:
+    ts = obj._arc_ts
+    ss = obj._arc_ss
 
     if s <= 0.0:
-        return 0.0
+        return 0, 0.0
     if s >= obj._arc_length:
-        return 1.0
+        return 0, 1.0
 
-    lo = 0
-    hi = len(table) - 1
+    # First sample whose length reaches s. The sentinels above
+    # guarantee 0 < i < len(ss).
+    i = bisect_left(ss, s)
+    t0, s0 = ts[i - 1], ss[i - 1]
+    t1, s1 = ts[i], ss[i]
 
-    while lo + 1 < hi:
-        mid = (lo + hi) // 2
-        if table[mid][1] < s:
-            lo = mid
-        else:
-            hi = mid
+    return i, t0 + (s - s0) * (t1 - t0) / (s1 - s0)
 
-    t0, s0 = table[lo]
-    t1, s1 = table[hi]
 
-    return t0 + (s - s0) * (t1 - t0) / (s1 - s0)
+def t_at_arc_length(obj, s: float) -> float:
+    return _arc_table_lookup(obj, s)[1]
+
+
+# Three point Gauss-Legendre nodes and weights on [-1, 1]. Exact for
+# polynomials up to degree five, the speed of a cubic is smooth enough
+# that one rule per table segment is accurate to ~1e-10.
+_GL_X = (-math.sqrt(0.6), 0.0, math.sqrt(0.6))
+_GL_W = (5.0 / 9.0, 8.0 / 9.0, 5.0 / 9.0)
+
+
+# Arc length between a and b by integrating the speed |B'(t)|
+def speed_integral(obj, a: float, b: float) -> float:
+    d = obj.derivative()
+    h = 0.5 * (b - a)
+    m = 0.5 * (a + b)
+    s = 0.0
+    for x, w in zip(_GL_X, _GL_W):
+        v = d.resolve(m + h * x)
+        s += w * math.hypot(v.x, v.y)
+    return s * h
+
+
+# The arc table is stored as two parallel columns (structure of arrays):
+# ts holds the sampled parameters and ss the arc length from t = 0 up to
+# each sample. Keeping the lengths in their own sequence lets lookups
+# bisect it directly instead of indexing into (t, length) pairs.
+# Every segment length is the integral of the speed instead of a chord,
+# so the lengths are exact up to the quadrature error rather than
+# always too short.
+def build_arc_table_quadrature(obj, steps: int):
+    if np is not None and hasattr(obj.derivative(), "resolve_batch"):
+        ts = np.linspace(0.0, 1.0, steps + 1)
+        h = 0.5 / steps
+        nodes = (ts[:-1] + h)[:, None] + h * np.array(_GL_X)
+        speeds = obj.derivative().resolve_batch(nodes.ravel()).lengths()
+        seg = speeds.reshape(steps, 3) @ np.array(_GL_W)
+        seg *= h
+        ss = np.empty_like(ts)
+        ss[0] = 0.0
+        np.cumsum(seg, out=ss[1:])
+        # Lookups probe single elements, which is cheaper on lists than
+        # on arrays
+        return ts.tolist(), ss.tolist()
+
+    ts = [0.0]
+    ss = [0.0]
+    length = 0.0
+    prev_t = 0.0
+    for i in range(1, steps + 1):
+        t = i / steps
+        length += speed_integral(obj, prev_t, t)
+        ts.append(t)
+        ss.append(length)
+        prev_t = t
+
+    return ts, ss
+
+
+# Table lookup followed by one Newton step on S(t) - s, with the speed
+# |B'(t)| as the derivative. Curves with an exact arc length use it for
+# S(t0). Otherwise S(t0) is the table length at the sample below s plus
+# the integrated speed from that sample to t0. Both are accurate enough
+# for the step to converge quadratically, so a coarse bake suffices.
+#
+# Where the speed is low (near a cusp) the step can overshoot far past
+# the answer, so it is only taken when it stays inside the table
+# interval that brackets s. Otherwise the table lookup is kept.
+def t_at_arc_length_refined(obj, s: float) -> float:
+    i, t0 = _arc_table_lookup(obj, s)
+    if i == 0:
+        return t0
+
+    speed = obj.derivative().resolve(t0).length()
+    if speed < 1e-12:
+        return t0
+
+    # t0 lies between ts[i - 1] and ts[i]
+    ts = obj._arc_ts
+    ss = obj._arc_ss
+    lo = ts[i - 1]
+    hi = ts[i]
+
+    if hasattr(obj, "arc_length_analytic"):
+        s0 = obj.arc_length_analytic(t0)
+    else:
+        s0 = ss[i - 1] + speed_integral(obj, lo, t0)
+
+    t1 = t0 + (s - s0) / speed
+    return t1 if lo <= t1 <= hi else t0
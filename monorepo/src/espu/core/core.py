@@ -1,8 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from importlib.metadata import distributions
 from pathlib import PurePosixPath, Path
+from types import MappingProxyType
+from typing import Mapping
+import functools
 import json
+import os
+import sys
 
 
 # Data Model
@@ -37,11 +41,34 @@ def _load_registry() -> dict[str, ComponentInfo]:
     return out
 
 
-_AVAILABLE: dict[str, ComponentInfo] = _load_registry()
+# The registry never changes after import. Expose it read-only and keep
+# the set of names precomputed so available() and unknown() dont have
+# to rebuild it on every call.
+_AVAILABLE: Mapping[str, ComponentInfo] = MappingProxyType(_load_registry())
+_AVAILABLE_KEYS: frozenset[str] = frozenset(_AVAILABLE)
 
 
 # Internal helpers
-def _espu_contributors() -> dict[str, set[str]]:
+def _cache_key() -> tuple[tuple[str, int], ...]:
+    """
+    Snapshot of every sys.path entry and its modification time.
+
+    Installing, upgrading or removing a distribution adds or deletes its
+    metadata directory, which bumps the mtime of the containing entry.
+    A changed key therefore means the contributor scan is stale.
+    """
+    key = []
+    for entry in sys.path:
+        try:
+            key.append((entry, os.stat(entry).st_mtime_ns))
+        except OSError:
+            # Missing or unreadable entries (including "") cant hold distributions
+            continue
+    return tuple(key)
+
+
+@functools.lru_cache(maxsize=1)
+def _scan_contributors(key: tuple) -> dict[str, frozenset[str]]:
     """
     distribution-name -> set of espu components it contributes.
 
@@ -50,8 +77,16 @@ def _espu_contributors() -> dict[str, set[str]]:
     - espu/<name>/...       -> "<name>"
     - espu/lib/...          -> ignored
     - espu/lib/<name>/...   -> "<name>"
+
+    The key argument is only used by the cache. Scanning walks every file
+    of every installed distribution, so the result is kept until
+    _cache_key() changes.
     """
-    result: dict[str, set[str]] = {}
+    # Imported here because importlib.metadata is comparatively heavy and
+    # only needed once something actually asks for installed components.
+    from importlib.metadata import distributions
+
+    result: dict[str, frozenset[str]] = {}
 
     for dist in distributions():
         files = dist.files or []
@@ -72,15 +107,24 @@ def _espu_contributors() -> dict[str, set[str]]:
                 found.add(parts[1])
 
         if found:
-            result[dist.metadata.get("Name", "<unknown>")] = found
+            result[dist.metadata.get("Name", "<unknown>")] = frozenset(found)
 
     return result
 
 
+def _espu_contributors() -> dict[str, frozenset[str]]:
+    # Shared cached result. Callers must not mutate it.
+    return _scan_contributors(_cache_key())
+
+
 # Public API
-def available() -> set[str]:
-    """Returns all available ESPU packages."""
-    return set(_AVAILABLE.keys())
+def available() -> frozenset[str]:
+    """Returns all available ESPU packages.
+
+    The result is a shared immutable set. Copy it with set() if you
+    need to modify it.
+    """
+    return _AVAILABLE_KEYS
 
 
 def installed() -> set[str]:
@@ -93,7 +137,7 @@ def installed() -> set[str]:
 
 def unknown() -> set[str]:
     """Returns any installed but unknown ESPU packages."""
-    return installed() - available()
+    return installed() - _AVAILABLE_KEYS
 
 
 def info(name: str) -> ComponentInfo:
@@ -105,4 +149,5 @@ def info(name: str) -> ComponentInfo:
 
 
 def contributors() -> dict[str, set[str]]:
-    return _espu_contributors()
+    """Returns which ESPU components each installed distribution contributes."""
+    return {name: set(comps) for name, comps in _espu_contributors().items()}
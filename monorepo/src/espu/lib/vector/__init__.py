@@ -1 +1,7 @@
 from .vector2 import Vec2
+
+# Vec2Array needs NumPy which is an optional dependency
+try:
+    from .array import Vec2Array
+except ImportError:
+    Vec2Array = None
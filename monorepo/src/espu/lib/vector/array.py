@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Iterable
+import numpy as np
+
+from .vector2 import Vec2
+
+
+# Structure of arrays counterpart to Vec2.
+# Holds many points as two contiguous float64 columns so batch math runs
+# as a handful of NumPy ufuncs instead of one Python object per point.
+class Vec2Array:
+    __slots__ = ("xs", "ys")
+
+    def __init__(self, xs, ys):
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+
+    @staticmethod
+    def from_vecs(vs: Iterable[Vec2]) -> Vec2Array:
+        vs = list(vs)
+        return Vec2Array([v.x for v in vs], [v.y for v in vs])
+
+    @staticmethod
+    def repeat(v: Vec2, n: int) -> Vec2Array:
+        return Vec2Array(np.full(n, v.x), np.full(n, v.y))
+
+    def to_vecs(self) -> list[Vec2]:
+        return [Vec2(float(x), float(y)) for x, y in zip(self.xs, self.ys)]
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, i: int) -> Vec2:
+        return Vec2(float(self.xs[i]), float(self.ys[i]))
+
+    def add(self, o: Vec2Array) -> Vec2Array:
+        xs = np.empty_like(self.xs)
+        ys = np.empty_like(self.ys)
+        np.add(self.xs, o.xs, out=xs)
+        np.add(self.ys, o.ys, out=ys)
+        return Vec2Array(xs, ys)
+
+    def sub(self, o: Vec2Array) -> Vec2Array:
+        xs = np.empty_like(self.xs)
+        ys = np.empty_like(self.ys)
+        np.subtract(self.xs, o.xs, out=xs)
+        np.subtract(self.ys, o.ys, out=ys)
+        return Vec2Array(xs, ys)
+
+    # s may be a scalar or an array with one factor per point
+    def scale(self, s) -> Vec2Array:
+        return Vec2Array(self.xs * s, self.ys * s)
+
+    __add__ = add
+    __sub__ = sub
+    __mul__ = scale
+    __rmul__ = scale
+
+    def lengths(self) -> np.ndarray:
+        return np.hypot(self.xs, self.ys)
+
+    # t may be a scalar or an array with one parameter per point
+    def lerp(self, o: Vec2Array, t) -> Vec2Array:
+        return Vec2Array(
+            self.xs + (o.xs - self.xs) * t, self.ys + (o.ys - self.ys) * t
+        )
+
+    def rotate(self, radians: float) -> Vec2Array:
+        c = np.cos(radians)
+        s = np.sin(radians)
+        return Vec2Array(self.xs * c - self.ys * s, self.xs * s + self.ys * c)
@@ -59,25 +59,32 @@ class Vec2:
         return self.dot(self)
 
     def length(self) -> float:
-        return math.sqrt(self.length_sq())
+        return math.hypot(self.x, self.y)
 
     def distance_sq(self, o: Vec2) -> float:
         return (self - o).length_sq()
 
     def distance(self, o: Vec2) -> float:
-        return math.sqrt(self.distance_sq(o))
+        return math.hypot(self.x - o.x, self.y - o.y)
+
+    # Multiply by a precomputed reciprocal. Unlike __truediv__ this skips
+    # the zero check, so callers must have ruled out a tiny divisor.
+    def _scale(self, inv: float) -> Vec2:
+        return Vec2(self.x * inv, self.y * inv)
 
     def normalize(self) -> Vec2:
         l = self.length()
         if l < DEFAULT_EPSILON:
             return Vec2.ZERO
-        return self / l
+        return self._scale(1.0 / l)
 
     def clamp_length(self, max_len: float) -> Vec2:
         l = self.length()
         if l <= max_len:
             return self
-        return self.normalize() * max_len
+        if l < DEFAULT_EPSILON:
+            return Vec2.ZERO
+        return self._scale(max_len / l)
 
     def lerp(self, o: Vec2, t: float) -> Vec2:
         return Vec2(self.x + (o.x - self.x) * t, self.y + (o.y - self.y) * t)
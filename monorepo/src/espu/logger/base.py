@@ -3,11 +3,13 @@
 # A handler owns a Formatter and knows how to output the formatted
 # string. The base handler enforces level filtering and stores the
 # formatter. Concrete handlers implement the "emit" method for the
-# actual I/O (terminal, file). Handlers expose two flags to indicate
-# whether the template requires the current time or thread name.
+# actual I/O (terminal, file). Handlers expose flags to indicate
+# whether the template requires the current time, thread name or
+# call site frame.
 # These flags allow the Logger to skip expensive calls when they
 # are unnecessary.
 
+from .config import NEED_TIME, NEED_THREAD, NEED_FRAME
 from .formatter import Formatter
 
 
@@ -37,6 +39,20 @@ class BaseHandler:
     def requires_thread(self) -> bool:
         return self.formatter.requires_thread
 
+    @property
+    def requires_frame(self) -> bool:
+        return self.formatter.requires_frame
+
+    @property
+    def needs_mask(self) -> int:
+        """The three requires_* flags as NEED_* bits."""
+        f = self.formatter
+        return (
+            (NEED_TIME if f.requires_time else 0)
+            | (NEED_THREAD if f.requires_thread else 0)
+            | (NEED_FRAME if f.requires_frame else 0)
+        )
+
     def handle(
         self,
         msg: str,
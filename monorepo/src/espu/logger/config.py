@@ -22,3 +22,14 @@ LEVEL_MAPPINGS = {
     "ERROR": {"low": "error", "up": "ERROR", "case": "Error"},
     "CRITICAL": {"low": "critical", "up": "CRITICAL", "case": "Critical"},
 }
+
+# The same spellings keyed by numeric level, for templates that use
+# "log_level.low", "log_level.up" or "log_level.case"
+LEVEL_LOW = {lvl: LEVEL_MAPPINGS[name]["low"] for lvl, name in LEVEL_NAMES.items()}
+LEVEL_UP = {lvl: LEVEL_MAPPINGS[name]["up"] for lvl, name in LEVEL_NAMES.items()}
+LEVEL_CASE = {lvl: LEVEL_MAPPINGS[name]["case"] for lvl, name in LEVEL_NAMES.items()}
+
+# Bits for the per call data a handler needs the Logger to capture
+NEED_TIME = 1
+NEED_THREAD = 2
+NEED_FRAME = 4
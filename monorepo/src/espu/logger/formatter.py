@@ -3,19 +3,49 @@
 # The Formatter class compiles a template into a sequence of callable
 # functions and static strings. When called, it stitches together the
 # static parts with the result of the dynamic parts. The Formatter
-# never allocates per log call and only computes the data that the
-# template requires.
+# only computes the data that the template requires.
 #
 # Each dynamic accessor is a small nested function that closes over
 # exactly the variable it needs. These accessors are compiled once
-# when the Formatter is created. On each log call the Formatter
-# iterates through its static/dynamic parts and builds the final string.
+# when the Formatter is created, together with a single "%"-style
+# format string that has one "%s" slot per accessor. On each log call
+# the Formatter runs the accessors and interpolates their results in
+# one C level "%" operation.
 
-import re
 import datetime
-from .config import LEVEL_MAPPINGS, LEVEL_NAMES
+import operator
+from .config import INFO, LEVEL_MAPPINGS, LEVEL_NAMES, LEVEL_LOW, LEVEL_UP, LEVEL_CASE
 from .utils import basename
 
+# Resolved once so accessors dont walk datetime.datetime on every call
+_datetime_fromts = datetime.datetime.fromtimestamp
+
+# "%"-style equivalent of a float format spec such as ".3f" or "+08.2e",
+# or None when the spec uses anything where str.format and the "%"
+# operator could disagree (alignment, grouping, "-" flag, ...).
+def _percent_spec(spec: str) -> str | None:
+    body, kind = spec[:-1], spec[-1:]
+    if kind not in ("e", "E", "f", "F", "g", "G"):
+        return None
+    if body[:1] in ("+", " "):
+        body = body[1:]
+    width, dot, precision = body.partition(".")
+    if width and not (width.isascii() and width.isdigit()):
+        return None
+    if dot and not (precision.isascii() and precision.isdigit()):
+        return None
+    return "%" + spec
+
+
+# Level name for every level from 0 up to the highest known level,
+# indexed directly by the numeric level. Levels without a name map to
+# "INFO", the same fallback LEVEL_NAMES.get(level, "INFO") gives.
+_LEVEL_NAME_ARR = tuple(LEVEL_NAMES.get(i, "INFO") for i in range(max(LEVEL_NAMES) + 1))
+_LEVEL_NAME_LEN = len(_LEVEL_NAME_ARR)
+
+# The keys of "log_level" and their spelling for each numeric level
+_LEVEL_KEYS = {"low": LEVEL_LOW, "up": LEVEL_UP, "case": LEVEL_CASE}
+
 
 class Formatter:
     """Compile a logging template into a callable formatter.
@@ -35,16 +65,18 @@ class Formatter:
     requires no per-call state beyond the frame and optional timestamp passed in.
     """
 
-    # Precompiled regex to find all dynamic expressions within "{{...}}"
-    _PATTERN = re.compile(r"\{\{(.*?)\}\}")
+    # Roots whose value is a dict. Only their dot paths need key lookups,
+    # every other root is resolved through plain attribute access.
+    _DICT_ROOTS = frozenset(("log_level",))
 
     __slots__ = (
         "template",
         "start_time",
         "requires_time",
         "requires_thread",
-        "_static_parts",
-        "_dyn_parts",
+        "requires_frame",
+        "_fmt",
+        "_accessors",
     )
 
     def __init__(self, template: str, start_time: float) -> None:
@@ -56,37 +88,61 @@ class Formatter:
         # They allow the Logger to avoid computing data that is not used.
         self.requires_time: bool = False
         self.requires_thread: bool = False
+        self.requires_frame: bool = False
 
-        # Parsed output plan. "_static_parts" holds the literal strings and
-        # "_dyn_parts" holds the callable accessors. The two lists have the
-        # same length: static parts at index i correspond to dynamic parts
-        # at index i
-        self._static_parts: list[str] = []
-        self._dyn_parts: list[callable | None] = []
+        # Runtime form of the plan. "_fmt" is the whole template as a
+        # "%"-style format string and "_accessors" holds the dynamic
+        # parts in the order of its "%s" slots.
+        self._fmt: str = ""
+        self._accessors: tuple[callable, ...] = ()
 
         self._compile_template()
 
     def _compile_template(self) -> None:
-        """Parse the template and produce lists of static and dynamic parts."""
-        static_parts: list[str] = []
-        dyn_parts: list[callable | None] = []
-        last = 0
-        for match in self._PATTERN.finditer(self.template):
+        """Parse the template into a flat list of static and dynamic parts."""
+        # Parsed output plan, only needed while compiling. One entry per
+        # template part in output order: (False, literal) for static text
+        # and (True, accessor) for a dynamic expression.
+        ops: list[tuple[bool, str | callable]] = []
+        append = ops.append
+        template = self.template
+        find = template.find
+        # Same matches as the regex \{\{(.*?)\}\}: every "{{" pairs with
+        # the first "}}" after it, and an expression never spans a line.
+        # Everything outside a match is literal text.
+        pos = 0
+        literal_start = 0
+        while True:
+            start = find("{{", pos)
+            if start < 0:
+                break
+            end = find("}}", start + 2)
+            if end < 0:
+                # No later "{{" can be closed either
+                break
+            newline = find("\n", start + 2, end)
+            if newline >= 0:
+                # Every "{{" before the newline runs into it, so the
+                # next possible match starts after it
+                pos = newline + 1
+                continue
             # Append any literal text before the expression.
-            if match.start() > last:
-                static_parts.append(self.template[last : match.start()])
-                dyn_parts.append(None)
-            # Extract the expression (strip whitespace to allow "{{ msg }}" etc.)
-            expr = match.group(1).strip()
-            static_parts.append("")
-            dyn_parts.append(self._compile_expr(expr))
-            last = match.end()
+            if literal_start < start:
+                append((False, template[literal_start:start]))
+            # Strip whitespace to allow "{{ msg }}" etc.
+            append((True, self._compile_expr(template[start + 2 : end].strip())))
+            pos = literal_start = end + 2
         # Append any trailing literal text
-        if last < len(self.template):
-            static_parts.append(self.template[last:])
-            dyn_parts.append(None)
-        self._static_parts = static_parts
-        self._dyn_parts = dyn_parts
+        if literal_start < len(template):
+            append((False, template[literal_start:]))
+
+        # Literal text is escaped so a "%" in the template can never be
+        # mistaken for a conversion. Accessors always return strings, so
+        # every slot is a plain "%s" and interpolation cannot fail.
+        self._fmt = "".join(
+            "%s" if is_dyn else val.replace("%", "%%") for is_dyn, val in ops
+        )
+        self._accessors = tuple(val for is_dyn, val in ops if is_dyn)
 
     def _compile_expr(self, expr: str) -> callable:
         """Compile a single dynamic expression into an accessor function."""
@@ -97,9 +153,18 @@ class Formatter:
             # Extract the format string inside the parentheses and strip quotes
             fmt = expr[len("ctime.format(") : -1].strip().strip("'\"")
 
-            def accessor(msg, level, levelname, frame, created, thread_name, _fmt=fmt):
+            def accessor(
+                msg,
+                level,
+                levelname,
+                frame,
+                created,
+                thread_name,
+                _fmt=fmt,
+                _fromts=_datetime_fromts,
+            ):
                 # Use created (passed in at call time) to format as a datetime
-                return datetime.datetime.fromtimestamp(created).strftime(_fmt)
+                return _fromts(created).strftime(_fmt)
 
             return accessor
 
@@ -107,6 +172,18 @@ class Formatter:
         if expr.startswith("time_since_start.format(") and expr.endswith(")"):
             self.requires_time = True
             fmt_spec = expr[len("time_since_start.format(") : -1].strip().strip("'\"")
+            # Float specs go through the "%" operator which skips the
+            # str.format spec parser on every call.
+            pct = _percent_spec(fmt_spec)
+            if pct is not None:
+
+                def accessor(
+                    msg, level, levelname, frame, created, thread_name, _pct=pct
+                ):
+                    return _pct % (created - self.start_time)
+
+                return accessor
+
             # Build a format string for the elapsed time
             fmt = "{" + ":" + fmt_spec + "}" if fmt_spec else "{}"
 
@@ -119,9 +196,11 @@ class Formatter:
         if ":" in expr:
             key_expr, fmt_spec = expr.split(":", 1)
             key_expr = key_expr.strip()
-            fmt = "{" + ":" + fmt_spec.strip() + "}"
+            fmt_spec = fmt_spec.strip()
+            fmt = "{" + ":" + fmt_spec + "}"
         else:
             key_expr = expr.strip()
+            fmt_spec = None
             fmt = None
 
         # Expressions can contain dot notation (e.g. "log_level.up")
@@ -136,27 +215,55 @@ class Formatter:
             self.requires_time = True
         if root == "threadName":
             self.requires_thread = True
+        if root in ("filename", "pathname", "lineno", "funcName"):
+            self.requires_frame = True
 
         # Precompile a getter for the root. This closure returns the
         # base value before applying any dot path or formatting.
         root_getter = self._compile_root_getter(root)
 
+        # "log_level.up" and friends only depend on the level. Render the
+        # text for every level now so the accessor is a single index.
+        if root == "log_level" and len(parts) == 2 and parts[1] in _LEVEL_KEYS:
+            return self._compile_level_accessor(_LEVEL_KEYS[parts[1]], fmt)
+
         # If there are further parts after the root (dot notation)
         # compile a resolver for the tail. The resolver navigates
         # through attributes or dictionary keys as needed.
         if len(parts) > 1:
             tail = parts[1:]
 
-            def resolve_tail(value):
-                for part in tail:
+            if root in self._DICT_ROOTS and len(tail) == 1:
+                # The common "log_level.up" shape. The root always returns
+                # a dict so a single key lookup is all that is needed.
+                def resolve_tail(value, _key=tail[0]):
+                    return value.get(_key)
+
+            elif root in self._DICT_ROOTS:
+
+                def resolve_tail(value):
+                    for part in tail:
+                        if value is None:
+                            return None
+                        # Support dict lookup for dictionary values.
+                        if type(value) is dict:
+                            value = value.get(part)
+                        else:
+                            value = getattr(value, part, None)
+                    return value
+
+            else:
+                # Plain attribute path. attrgetter walks the whole path
+                # in a single C call. An unknown root resolves to None,
+                # which must stay invalid rather than expose attributes
+                # of None itself.
+                def resolve_tail(value, _get=operator.attrgetter(".".join(tail))):
                     if value is None:
                         return None
-                    # Support dict lookup for dictionary values.
-                    if isinstance(value, dict):
-                        value = value.get(part)
-                    else:
-                        value = getattr(value, part, None)
-                return value
+                    try:
+                        return _get(value)
+                    except AttributeError:
+                        return None
 
             if fmt is None:
 
@@ -208,6 +315,17 @@ class Formatter:
 
             return accessor
         else:
+            # Elapsed time is always a float, so a float spec can use the
+            # "%" operator instead of str.format (e.g. "{{time_since_start:.3f}}").
+            pct = _percent_spec(fmt_spec) if root == "time_since_start" else None
+            if pct is not None:
+
+                def accessor(
+                    msg, level, levelname, frame, created, thread_name, _pct=pct
+                ):
+                    return _pct % (created - self.start_time)
+
+                return accessor
 
             def accessor(
                 msg,
@@ -229,6 +347,42 @@ class Formatter:
 
             return accessor
 
+    def _compile_level_accessor(self, names: dict, fmt: str | None) -> callable:
+        """Return an accessor indexing a table of per level output strings.
+
+        The table follows _LEVEL_NAME_ARR, so unknown levels render like
+        INFO exactly as the generic log_level path does.
+        """
+
+        def render(name):
+            if fmt is None:
+                return name
+            try:
+                return fmt.format(name)
+            except Exception:
+                return "<format_error>"
+
+        info = render(names[INFO])
+        table = tuple(
+            render(names[lvl]) if lvl in names else info
+            for lvl in range(_LEVEL_NAME_LEN)
+        )
+
+        def accessor(
+            msg,
+            level,
+            levelname,
+            frame,
+            created,
+            thread_name,
+            _table=table,
+            _n=_LEVEL_NAME_LEN,
+            _info=info,
+        ):
+            return _table[level] if 0 <= level < _n else _info
+
+        return accessor
+
     def _compile_root_getter(self, key: str) -> callable:
         """Return a function that fetches the root value for a given key.
 
@@ -246,15 +400,23 @@ class Formatter:
             # Return the mapping for the level (low, up, case).
             # Look up the levelname in the precomputed dictionary.
             # If not found, fall back to computing on the fly.
-            def get(msg, level, levelname, frame, created, thread_name):
-                return LEVEL_MAPPINGS.get(
-                    levelname,
-                    {
+            def get(
+                msg,
+                level,
+                levelname,
+                frame,
+                created,
+                thread_name,
+                _get=LEVEL_MAPPINGS.get,
+            ):
+                mapping = _get(levelname)
+                if mapping is None:
+                    mapping = {
                         "low": levelname.lower(),
                         "up": levelname.upper(),
                         "case": levelname.capitalize(),
-                    },
-                )
+                    }
+                return mapping
 
             return get
         if key == "ctime":
@@ -262,8 +424,16 @@ class Formatter:
             # Note that created may be None if requires_time was false,
             # but this should never be called in that case because the
             # accessor is only present when requires_time is True.
-            def get(msg, level, levelname, frame, created, thread_name):
-                return datetime.datetime.fromtimestamp(created)
+            def get(
+                msg,
+                level,
+                levelname,
+                frame,
+                created,
+                thread_name,
+                _fromts=_datetime_fromts,
+            ):
+                return _fromts(created)
 
             return get
         if key == "time_since_start":
@@ -343,14 +513,15 @@ class Formatter:
         """
         # Lookup the level name once. If the level isnt in the map,
         # fall back to INFO.
-        levelname = LEVEL_NAMES.get(level, "INFO")
-
-        # Build the output by interleaving static strings and dynamic values
-        parts: list[str] = []
-        for static, dyn in zip(self._static_parts, self._dyn_parts):
-            if static:
-                parts.append(static)
-            if dyn is not None:
-                # dynamic accessor returns a string (or placeholder if None)
-                parts.append(dyn(msg, level, levelname, frame, created, thread_name))
-        return "".join(parts)
+        levelname = (
+            _LEVEL_NAME_ARR[level] if 0 <= level < _LEVEL_NAME_LEN else "INFO"
+        )
+
+        # Fill the precompiled format string with the accessor results.
+        # Each accessor returns a string (or placeholder if None).
+        return self._fmt % tuple(
+            [
+                dyn(msg, level, levelname, frame, created, thread_name)
+                for dyn in self._accessors
+            ]
+        )
@@ -1,10 +1,14 @@
 from .base import BaseHandler
 from .config import DEBUG, INFO, WARNING, ERROR, CRITICAL
+from .config import NEED_TIME, NEED_THREAD, NEED_FRAME
 from .formatter import Formatter
 import sys
 import time
 import threading
 
+_time = time.time
+_current_thread = threading.current_thread
+
 
 class TerminalLogger(BaseHandler):
     """Handler that writes log messages to a text stream (stdout by default)
@@ -104,9 +108,11 @@ class FileLogger(BaseHandler):
     encoding: str | None, optional
         Encoding used when opening the file. Defaults to "utf-8".
     buffer_size: int, optional
-        Number of log calls to buffer before writing to disk.
-        A value of 1 disables buffering (immediate write). Larger
-        values improve I/O throughput at the cost of delaying logs (default: 5).
+        Number of log calls to buffer before handing them to the file.
+        Writes go through a 64 KiB file buffer and only reach the disk
+        when it fills, on flush() or on close(). A value of 1 flushes
+        after every log call. Larger values improve I/O throughput at
+        the cost of delaying logs (default: 5).
     """
 
     __slots__ = ("file", "buffer_size", "buffer", "closed")
@@ -144,18 +150,20 @@ class FileLogger(BaseHandler):
         encoding: str | None, optional
             Encoding used when opening the file. Defaults to "utf-8".
         buffer_size: int, optional
-            Number of log calls to buffer before writing to disk.
-            A value of 1 disables buffering (immediate write). Larger
-            values improve I/O throughput at the cost of delaying logs (default: 5).
+            Number of log calls to buffer before handing them to the file.
+            Writes go through a 64 KiB file buffer and only reach the disk
+            when it fills, on flush() or on close(). A value of 1 flushes
+            after every log call. Larger values improve I/O throughput at
+            the cost of delaying logs (default: 5).
         """
         if start_time is None:
             start_time = time.time()
         template = "{{msg}}" if template is None else template
         formatter = Formatter(template=template, start_time=start_time)
         super().__init__(level=level, formatter=formatter)
-        self.file = open(filename, mode, encoding=encoding)
-        # Ensure buffer_size is at least 1. A value of 1 means
-        # write after every log call. Larger values batch writes.
+        self.file = open(filename, mode, buffering=1 << 16, encoding=encoding)
+        # Ensure buffer_size is at least 1. A value of 1 means every
+        # log call is flushed to disk. Larger values batch writes.
         self.buffer_size = 1 if buffer_size <= 1 else buffer_size
         self.buffer: list[str] = []
         self.closed: bool = False
@@ -171,21 +179,27 @@ class FileLogger(BaseHandler):
         if self.closed:
             return
         line = self.formatter.format(msg, level, frame, created, thread_name)
-        self.buffer.append(line)
-        # Flush to disk when the buffer reaches the configured size
+        # Lines are stored newline terminated so they can be written as is
+        self.buffer.append(line + "\n")
+        # Hand the batch to the file when the buffer reaches the configured
+        # size. The file buffer decides when it actually reaches the disk.
         if len(self.buffer) >= self.buffer_size:
-            self.flush()
+            self.file.writelines(self.buffer)
+            self.buffer.clear()
+            # Unbuffered handlers are used where every line has to be on
+            # disk right away, so skip the file buffer as well
+            if self.buffer_size == 1:
+                self.file.flush()
 
     def flush(self) -> None:
         """Write any buffered log lines to disk and clear the buffer."""
         if self.closed:
             return
-        if not self.buffer:
-            return
-        # Joining with newline once per flush reduces the number of write calls
-        self.file.write("\n".join(self.buffer) + "\n")
+        if self.buffer:
+            # writelines avoids building one large joined string
+            self.file.writelines(self.buffer)
+            self.buffer.clear()
         self.file.flush()
-        self.buffer.clear()
 
     def close(self) -> None:
         """Flush any pending logs and close the file."""
@@ -204,8 +218,8 @@ class FileLogger(BaseHandler):
 #
 # The Logger coordinates log calls, level filtering and fan-out to
 # handlers. The Logger itself performs no formatting and knows
-# nothing about templates. It captures the call site frame and,
-# if necessary, the current timestamp and thread name. It then
+# nothing about templates. It captures, if necessary, the call site
+# frame, the current timestamp and the thread name. It then
 # passes these raw values to each attached handler to format and
 # output.
 #
@@ -229,8 +243,7 @@ class Logger:
         "level",
         "start_time",
         "_handlers",
-        "_needs_time",
-        "_needs_thread",
+        "_needs_mask",
         "_thread_safe",
         "_lock",
     )
@@ -242,9 +255,9 @@ class Logger:
         # Handlers will be stored in a simple list. Order matters for
         # file/terminal ordering but has no functional effect.
         self._handlers: list[BaseHandler] = []
-        # Internal flags to memoize whether any handler needs time or thread
-        self._needs_time: bool = False
-        self._needs_thread: bool = False
+        # NEED_* bits memoizing whether any handler needs time, thread
+        # or the call site frame
+        self._needs_mask: int = 0
 
         self._thread_safe = thread_safe
         # Create a lock if necessary
@@ -276,8 +289,8 @@ class Logger:
             handler.formatter.start_time = self.start_time
         except AttributeError:
             pass
-        # Recalculate what data needs to be captured on each log call
-        self._recalc_needs()
+        # A new handler can only add to what needs to be captured
+        self._needs_mask |= handler.needs_mask
 
     def detach(self, handler: BaseHandler) -> None:
         """Remove a handler from this logger if present."""
@@ -294,19 +307,19 @@ class Logger:
             self._handlers.remove(handler)
         except ValueError:
             return
-        self._recalc_needs()
+        # Only rescan when the removed handler needed something, another
+        # handler may or may not still need it
+        if handler.needs_mask & self._needs_mask:
+            self._recalc_needs()
 
     def _recalc_needs(self) -> None:
-        """Determine whether any attached handler requires time or thread."""
-        needs_time = False
-        needs_thread = False
+        """Determine whether any attached handler requires time, thread or frame."""
+        mask = 0
         for h in self._handlers:
             # Simply OR together the flags from all handlers. If any
             # handler needs a value, compute it once per log call.
-            needs_time |= h.requires_time
-            needs_thread |= h.requires_thread
-        self._needs_time = needs_time
-        self._needs_thread = needs_thread
+            mask |= h.needs_mask
+        self._needs_mask = mask
 
     def _log(self, level: int, msg: str) -> None:
         """Dispatch a log message to all attached handlers."""
@@ -321,33 +334,44 @@ class Logger:
             self._dispatch(level, msg)
 
     def _dispatch(self, level: int, msg: str) -> None:
-        frame = sys._getframe(2)
-        created = time.time() if self._needs_time else None
-        thread_name = threading.current_thread().name if self._needs_thread else None
+        mask = self._needs_mask
+        # Walking the frame chain is not free, skip it unless a template
+        # uses filename, pathname, lineno or funcName
+        frame = sys._getframe(2) if mask & NEED_FRAME else None
+        created = _time() if mask & NEED_TIME else None
+        # Read on every call, threads (the main thread and pool workers
+        # in particular) can be renamed after they first log
+        thread_name = _current_thread().name if mask & NEED_THREAD else None
 
         # Fan out to handlers. Each handler performs its own logic.
         for handler in self._handlers:
             handler.handle(msg, level, frame, created, thread_name)
 
-    # Convenience methods for each log level. These simply call _log
-    # with the appropriate level constant. The docstring on info() is
-    # representative for all other level methods.
+    # Convenience methods for each log level. The level check is
+    # repeated here so a filtered call returns without entering _log.
+    # The docstring on info() is representative for all other level
+    # methods.
     def debug(self, msg: str) -> None:
         """Log a message with severity DEBUG."""
-        self._log(DEBUG, msg)
+        if self.level <= DEBUG:
+            self._log(DEBUG, msg)
 
     def info(self, msg: str) -> None:
         """Log a message with severity INFO."""
-        self._log(INFO, msg)
+        if self.level <= INFO:
+            self._log(INFO, msg)
 
     def warning(self, msg: str) -> None:
         """Log a message with severity WARNING."""
-        self._log(WARNING, msg)
+        if self.level <= WARNING:
+            self._log(WARNING, msg)
 
     def error(self, msg: str) -> None:
         """Log a message with severity ERROR."""
-        self._log(ERROR, msg)
+        if self.level <= ERROR:
+            self._log(ERROR, msg)
 
     def critical(self, msg: str) -> None:
         """Log a message with severity CRITICAL."""
-        self._log(CRITICAL, msg)
+        if self.level <= CRITICAL:
+            self._log(CRITICAL, msg)
@@ -1,6 +1,10 @@
-# Simplified filename from path without using os.path.basename to minimize imports
+from functools import lru_cache
+
+
+# Simplified filename from path without using os.path.basename to minimize imports.
+# Cached because a program only logs from a handful of source files.
+@lru_cache(maxsize=256)
 def basename(path: str) -> str:
-    i = path.rfind("/")
-    j = path.rfind("\\")
-    k = i if i > j else j
-    return path[k + 1 :] if k != -1 else path
+    # With no separator k is -1 and the slice is the whole path
+    k = max(path.rfind("/"), path.rfind("\\"))
+    return path[k + 1 :]
@@ -1 +1 @@
-from .wol import wake_on_lan
+from .wol import wake_on_lan, wake_on_lan_many, WolSender
@@ -18,7 +18,7 @@ class GetAdaptersAddressesError(CoreError):
 
 
 class AdapterBufferOverflow(CoreError):
-    """Raised when the set buffer size was insufficient to hold all adapter data."""
+    """Raised when the buffer stayed too small to hold all adapter data after retrying."""
 
 
 class DuplicateIPError(CoreError):
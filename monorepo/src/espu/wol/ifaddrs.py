@@ -0,0 +1,96 @@
+import socket
+import sys
+
+# Unix systems list every interface address through getifaddrs(3). The
+# socket module has no wrapper for it, so it is called through ctypes
+# the same way sendmmsg is. Only the IPv4 entries are read, which is all
+# get_ip_owners and count_ip_owners need.
+
+# BSD derived systems (macOS included) start every sockaddr with a
+# length byte followed by a one byte family. Linux uses a two byte
+# family instead.
+_BSD_SOCKADDR = sys.platform == "darwin" or "bsd" in sys.platform
+
+# None until the first use, False if libc has no getifaddrs
+_bound = None
+
+
+def _bind():
+    global _bound
+    if _bound is not None:
+        return _bound
+
+    import ctypes
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        getifaddrs = libc.getifaddrs
+        freeifaddrs = libc.freeifaddrs
+    except (OSError, AttributeError):
+        _bound = False
+        return _bound
+
+    # struct sockaddr_in, only the family and the address are read
+    if _BSD_SOCKADDR:
+        _family = [("sin_len", ctypes.c_ubyte), ("sin_family", ctypes.c_ubyte)]
+    else:
+        _family = [("sin_family", ctypes.c_ushort)]
+
+    class sockaddr_in(ctypes.Structure):
+        _fields_ = _family + [
+            ("sin_port", ctypes.c_uint16),
+            ("sin_addr", ctypes.c_ubyte * 4),
+            ("sin_zero", ctypes.c_ubyte * 8),
+        ]
+
+    # struct ifaddrs: one address of one interface, linked through
+    # ifa_next. ifa_addr may be NULL for interfaces without an address.
+    class ifaddrs(ctypes.Structure):
+        pass
+
+    ifaddrs._fields_ = [
+        ("ifa_next", ctypes.POINTER(ifaddrs)),
+        ("ifa_name", ctypes.c_char_p),
+        ("ifa_flags", ctypes.c_uint),
+        ("ifa_addr", ctypes.POINTER(sockaddr_in)),
+        ("ifa_netmask", ctypes.c_void_p),
+        ("ifa_ifu", ctypes.c_void_p),  # broadcast or point-to-point address
+        ("ifa_data", ctypes.c_void_p),
+    ]
+
+    getifaddrs.argtypes = [ctypes.POINTER(ctypes.POINTER(ifaddrs))]
+    getifaddrs.restype = ctypes.c_int
+    freeifaddrs.argtypes = [ctypes.POINTER(ifaddrs)]
+    freeifaddrs.restype = None
+
+    _bound = (ctypes, getifaddrs, freeifaddrs, ifaddrs)
+    return _bound
+
+
+# Returns (interface name, IPv4 address) for every IPv4 address on the
+# system, or None if getifaddrs cannot be used here.
+def ipv4_addresses() -> list | None:
+    bound = _bind()
+    if not bound:
+        return None
+    ctypes, getifaddrs, freeifaddrs, ifaddrs = bound
+
+    head = ctypes.POINTER(ifaddrs)()
+    if getifaddrs(ctypes.byref(head)) != 0:
+        return None
+
+    result = []
+    try:
+        p = head
+        while p:
+            ifa = p.contents
+            addr = ifa.ifa_addr
+            if addr and addr.contents.sin_family == socket.AF_INET:
+                name = ifa.ifa_name.decode(errors="replace")
+                result.append((name, socket.inet_ntoa(bytes(addr.contents.sin_addr))))
+            p = ifa.ifa_next
+    finally:
+        # The whole list is one allocation owned by libc
+        freeifaddrs(head)
+
+    return result
@@ -0,0 +1,147 @@
+import os
+import socket
+
+# Linux can hand many datagrams to the kernel in one sendmmsg(2) call.
+# Python's socket module has no wrapper for it, so it is called through
+# ctypes. The structs mirror <sys/socket.h> and <netinet/in.h>, ctypes
+# inserts the same padding the C compiler would.
+#
+# sendmmsg caps a single call at UIO_MAXIOV (1024) messages, batches of
+# 100 already amortize the syscall and keep the arrays small.
+BATCH_SIZE = 100
+
+# None until the first use, False if libc has no sendmmsg
+_bound = None
+
+
+def _bind():
+    global _bound
+    if _bound is not None:
+        return _bound
+
+    import ctypes
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fn = libc.sendmmsg
+    except (OSError, AttributeError):
+        _bound = False
+        return _bound
+
+    # struct iovec: one contiguous chunk of payload
+    class iovec(ctypes.Structure):
+        _fields_ = [
+            ("iov_base", ctypes.c_void_p),
+            ("iov_len", ctypes.c_size_t),
+        ]
+
+    # struct msghdr: destination, payload chunks and ancillary data
+    class msghdr(ctypes.Structure):
+        _fields_ = [
+            ("msg_name", ctypes.c_void_p),
+            ("msg_namelen", ctypes.c_uint32),
+            ("msg_iov", ctypes.c_void_p),  # struct iovec *
+            ("msg_iovlen", ctypes.c_size_t),
+            ("msg_control", ctypes.c_void_p),
+            ("msg_controllen", ctypes.c_size_t),
+            ("msg_flags", ctypes.c_int),
+        ]
+
+    # struct mmsghdr: a msghdr plus the byte count the kernel sent
+    class mmsghdr(ctypes.Structure):
+        _fields_ = [
+            ("msg_hdr", msghdr),
+            ("msg_len", ctypes.c_uint),
+        ]
+
+    # struct sockaddr_in, family in host order, port and address in
+    # network order
+    class sockaddr_in(ctypes.Structure):
+        _fields_ = [
+            ("sin_family", ctypes.c_ushort),
+            ("sin_port", ctypes.c_uint16),
+            ("sin_addr", ctypes.c_ubyte * 4),
+            ("sin_zero", ctypes.c_ubyte * 8),
+        ]
+
+    fn.argtypes = [
+        ctypes.c_int,  # socket fd
+        ctypes.c_void_p,  # struct mmsghdr * (first message to send)
+        ctypes.c_uint,  # number of messages
+        ctypes.c_int,  # flags
+    ]
+    fn.restype = ctypes.c_int
+
+    _bound = (ctypes, fn, iovec, mmsghdr, sockaddr_in)
+    return _bound
+
+
+# True when send_batch can use sendmmsg on this system
+def available() -> bool:
+    return bool(_bind())
+
+
+# A magic packet is 6 sync bytes (0xFF) followed by the MAC 16 times
+PACKET_SIZE = 6 + 16 * 6
+
+
+# Sends a magic packet for every MAC to (dest_ip, port) on sock with as
+# few sendmmsg calls as possible. macs are validated 6 byte raw MACs.
+# dest_ip may be a host name, it is resolved once.
+# Raises OSError like socket.sendto does.
+def send_magic_batch(sock: socket.socket, macs: list, dest_ip: str, port: int) -> None:
+    ctypes, fn, iovec, mmsghdr, sockaddr_in = _bind()
+
+    # One destination shared by every message
+    addr = sockaddr_in()
+    addr.sin_family = socket.AF_INET
+    addr.sin_port = socket.htons(port)
+    addr.sin_addr[:] = socket.inet_aton(socket.gethostbyname(dest_ip))
+    addr_ptr = ctypes.addressof(addr)
+    addr_len = ctypes.sizeof(addr)
+
+    iov_size = ctypes.sizeof(iovec)
+    fd = sock.fileno()
+    for start in range(0, len(macs), BATCH_SIZE):
+        batch = macs[start : start + BATCH_SIZE]
+        n = len(batch)
+
+        # The packets of the batch are written straight into one arena,
+        # one column at a time. The sync bytes are the fill value and
+        # each MAC column is a single strided copy of that MAC byte from
+        # every packet, so no object is created per packet.
+        arena = bytearray(b"\xff") * (PACKET_SIZE * n)
+        joined = b"".join(batch)
+        for k in range(6):
+            column = joined[k::6]
+            for j in range(6 + k, PACKET_SIZE, 6):
+                arena[j::PACKET_SIZE] = column
+        buf = (ctypes.c_ubyte * len(arena)).from_buffer(arena)
+
+        # The iovecs point at their slice of the arena by plain address
+        # arithmetic
+        iovs = (iovec * n)()
+        msgs = (mmsghdr * n)()
+        data = ctypes.addressof(buf)
+        iov_addr = ctypes.addressof(iovs)
+        for i in range(n):
+            iov = iovs[i]
+            iov.iov_base = data + i * PACKET_SIZE
+            iov.iov_len = PACKET_SIZE
+            hdr = msgs[i].msg_hdr
+            hdr.msg_name = addr_ptr
+            hdr.msg_namelen = addr_len
+            hdr.msg_iov = iov_addr + i * iov_size
+            hdr.msg_iovlen = 1
+
+        # The kernel may accept only part of the array, send the rest
+        base = ctypes.addressof(msgs)
+        size = ctypes.sizeof(mmsghdr)
+        sent = 0
+        while sent < n:
+            ret = fn(fd, base + sent * size, n - sent, 0)
+            if ret < 0:
+                err = ctypes.get_errno()
+                raise OSError(err, os.strerror(err))
+            sent += ret
+
@@ -1,23 +1,55 @@
+import functools
 import socket
 import struct
 import platform
-from .win_adapters import get_windows_adapters
+import time
+from .win_adapters import get_windows_adapters, get_adapter_index, clear_adapter_cache
+from . import ifaddrs
 from .exceptions import InvalidMACFormat
 
+# The platform cannot change while running, decide it once at import
+_IS_WINDOWS = platform.system() == "Windows"
+
 
 # Magic packet according to
 # https://www.amd.com/content/dam/amd/en/documents/archived-tech-docs/white-papers/20213.pdf
 # Made from the MAC broadcast address (FF:FF:FF:FF:FF:FF) and the target MAC repeated 16 times
+#
+# Cached by the MAC string as given, so waking the same host again skips
+# the parsing and validation too. Invalid MACs raise and are not cached.
+@functools.lru_cache(maxsize=128)
 def build_magic_packet(mac_address: str) -> bytes:
+    return _magic_packet(parse_mac(mac_address))
+
+
+# Validates a MAC address and returns its 6 raw bytes
+def parse_mac(mac_address: str) -> bytes:
     mac = mac_address.replace(":", "").replace("-", "").strip()
-    if len(mac) != 12 or any(c not in "0123456789abcdefABCDEF" for c in mac):
+    # fromhex validates the digits in C. It also skips whitespace between
+    # bytes, which the length check on the string rules out.
+    try:
+        raw = bytes.fromhex(mac)
+    except ValueError:
+        raise InvalidMACFormat(mac_address) from None
+    if len(mac) != 12 or len(raw) != 6:
         raise InvalidMACFormat(mac_address)
-    return b"\xff" * 6 + bytes.fromhex(mac) * 16
+    return raw
+
+
+# raw is the validated 6 byte MAC
+def _magic_packet(raw: bytes) -> bytes:
+    return b"\xff" * 6 + raw * 16
+
+
+# Formats compiled once instead of parsed on every pack call
+_BE_U32 = struct.Struct("!I")
+# struct ifreq: 16 byte interface name, the rest is filled by the kernel
+_IFREQ = struct.Struct("16s240x")
 
 
 def set_windows_unicast_if(sock: socket.socket, ifindex: int):
     IP_UNICAST_IF = 31  # undocumented but stable socket option
-    sock.setsockopt(socket.IPPROTO_IP, IP_UNICAST_IF, struct.pack("!I", ifindex))
+    sock.setsockopt(socket.IPPROTO_IP, IP_UNICAST_IF, _BE_U32.pack(ifindex))
 
 
 # Resolve an interface name (eth0, enp7s0, whatever) to its IPv4 address on Unix systems.
@@ -28,54 +60,133 @@ def get_iface_ipv4_unix(ifname: str) -> str:
     import fcntl
 
     SIOCGIFADDR = 0x8915  # Unix ioctl code to resolve interface name to IP
-    ifreq = struct.pack("256s", ifname.encode()[:15])
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    ifreq = _IFREQ.pack(ifname.encode()[:15])
+    res = fcntl.ioctl(_ioctl_socket().fileno(), SIOCGIFADDR, ifreq)
+    # IPv4 address is at bytes 20-24 of the returned struct
+    return socket.inet_ntoa(res[20:24])
 
-    try:
-        res = fcntl.ioctl(s.fileno(), SIOCGIFADDR, ifreq)
-        # IPv4 address is at bytes 20-24 of the returned struct
-        return socket.inet_ntoa(res[20:24])
-    finally:
-        s.close()
+
+# The ioctl only needs some AF_INET socket as a handle, nothing is ever
+# sent on it. One is opened on first use and kept for the process.
+_ioctl_sock = None
+
+
+def _ioctl_socket() -> socket.socket:
+    global _ioctl_sock
+    if _ioctl_sock is None:
+        _ioctl_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    return _ioctl_sock
 
 
 # Returns all interfaces that own an IPv4. Used if there is a weird setup
 # where a device has two or more NICs on different networks that share
 # the same IPv4 Address. Unlikely but its the entire reason i put
 # myself trough the pain of working with Win32 API.
-def get_ip_owners(win_buffer_size: int) -> dict:
+def get_ip_owners(win_buffer_size: int | None = None) -> dict:
     owners = {}
-    system = platform.system().lower()
+    if _IS_WINDOWS:
+        # Call that Win32 API monster, through the cached adapter index
+        for ip, adapters in get_adapter_index(win_buffer_size)[0].items():
+            owners[ip] = [a.friendly or a.name for a in adapters]
+    else:
+        for ifname, ip in _unix_ipv4_addresses():
+            owners.setdefault(ip, []).append(ifname)
 
-    if system == "windows":
-        # Call that Win32 API monster
-        for a in get_windows_adapters(win_buffer_size):
-            for ip in a["ips"]:
-                owners.setdefault(ip, []).append(a["friendly"] or a["name"])
+    return owners
+
+
+# Number of interfaces owning ip, counting stops at 2 since only
+# "more than one" matters to the caller. Cheaper than get_ip_owners
+# because no names are decoded (Windows) and no mapping of every
+# address is built (Unix).
+def count_ip_owners(ip: str, win_buffer_size: int | None = None) -> int:
+    count = 0
+    if _IS_WINDOWS:
+        count = min(len(get_adapter_index(win_buffer_size)[0].get(ip, ())), 2)
     else:
-        import psutil
+        # An interface can list the same address twice, count it once
+        seen = None
+        for ifname, addr in _unix_ipv4_addresses():
+            if addr == ip and ifname != seen:
+                if seen is not None:
+                    return 2
+                seen = ifname
+                count = 1
 
-        for ifname, addrs in psutil.net_if_addrs().items():
-            for addr in addrs:
-                if addr.family == socket.AF_INET:
-                    owners.setdefault(addr.address, []).append(ifname)
+    return count
 
-    return owners
+
+# (interface name, IPv4) pairs on Unix. getifaddrs is asked directly,
+# psutil is only imported on systems where that is not possible.
+def _unix_ipv4_addresses() -> list:
+    pairs = ifaddrs.ipv4_addresses()
+    if pairs is not None:
+        return pairs
+
+    import psutil
+
+    return [
+        (ifname, addr.address)
+        for ifname, addrs in psutil.net_if_addrs().items()
+        for addr in addrs
+        if addr.family == socket.AF_INET
+    ]
+
+
+# Resolved interfaces are reused for this many seconds, so repeated
+# wakes through the same interface skip the lookup. Addresses can change
+# (DHCP), so entries do not live forever.
+IFACE_CACHE_TTL = 2.0
+
+# iface -> (monotonic time, (ip, None)), Unix only. On Windows the
+# answers are memoized in the adapter index instead, which already
+# expires with the adapter snapshot.
+_iface_cache = {}
 
 
 # Resolves an interface name to:
 #   its IPv4 address
 #   and (on Windows) its interface index
-def resolve_iface(iface: str, win_buffer_size: int):
-    system = platform.system().lower()
-
-    if system == "windows":
-        for a in get_windows_adapters(win_buffer_size):
-            if iface.lower() in (a["friendly"] or "").lower() or iface == a["name"]:
-                # 169.254.x.x is APIPA (Automatic Private IP Addressing).
-                # Basically meaning that Windows screwed up to get an IP.
-                ip = next((i for i in a["ips"] if not i.startswith("169.254.")), None)
-                return ip, a["ifindex"]
-        return None, None
-    else:
-        return get_iface_ipv4_unix(iface), None
+def resolve_iface(iface: str, win_buffer_size: int | None = None):
+    if _IS_WINDOWS:
+        # Each name is matched once per adapter snapshot, misses included
+        by_iface = get_adapter_index(win_buffer_size)[1]
+        hit = by_iface.get(iface)
+        if hit is None:
+            hit = by_iface[iface] = _match_windows_iface(iface, win_buffer_size)
+        return hit
+
+    now = time.monotonic()
+    hit = _iface_cache.get(iface)
+    if hit is not None and now - hit[0] < IFACE_CACHE_TTL:
+        return hit[1]
+
+    try:
+        result = get_iface_ipv4_unix(iface), None
+    except OSError:
+        # Unknown or unconfigured interface, forget anything cached
+        _iface_cache.pop(iface, None)
+        raise
+    _iface_cache[iface] = (now, result)
+    return result
+
+
+# First adapter whose friendly name contains iface (case insensitive)
+# or whose internal name equals it
+def _match_windows_iface(iface: str, win_buffer_size: int | None):
+    needle = iface.lower()
+    for a in get_windows_adapters(win_buffer_size):
+        if needle in a.friendly.lower() or iface == a.name:
+            # primary_ip already skips APIPA (169.254.x.x) addresses
+            return a.primary_ip, a.ifindex
+    return None, None
+
+
+# Drops every cached interface, for callers that know the network changed
+def _clear_iface_cache() -> None:
+    _iface_cache.clear()
+    if _IS_WINDOWS:
+        clear_adapter_cache()
+
+
+resolve_iface.cache_clear = _clear_iface_cache
@@ -1,27 +1,32 @@
+import platform
 import socket
+import time
 from .exceptions import AdapterBufferOverflow, GetAdaptersAddressesError
 
+# Address family constant for IPv4
+# This filters results so Windows only returns IPv4 addresses.
+AF_INET = 2
 
-# Use the horrific Win32 API to get a list of Windows network adapters.
-# This function asks Windows for a snapshot of all IPv4 adapters,
-# then manually walks several linked lists inside a raw memory blob.
-# I have gone trough the pain of commenting almost every line in here
-# just so anyone reading this code has a shot of understanding what is going on here.
-#
-# Just a funfact:
-# This entire Monster exists purely because Windows doesnt accept
-# interface names into sock.bind() directly unlike Unix. Gotta love it.
-def get_windows_adapters(win_buffer_size: int) -> list:
+# Flags telling Windows to skip data we never read. Only the unicast
+# addresses are needed, so anycast, multicast and DNS lookups are
+# skipped. Prefix (subnet) data is not requested either.
+GAA_FLAG_SKIP_ANYCAST = 0x0002
+GAA_FLAG_SKIP_MULTICAST = 0x0004
+GAA_FLAG_SKIP_DNS_SERVER = 0x0008
+GAA_FLAG_SKIP_DNS_INFO = 0x0800
+GAA_FLAGS = (
+    GAA_FLAG_SKIP_ANYCAST
+    | GAA_FLAG_SKIP_MULTICAST
+    | GAA_FLAG_SKIP_DNS_SERVER
+    | GAA_FLAG_SKIP_DNS_INFO
+)
+
+# The structs and the GetAdaptersAddresses binding only exist on
+# Windows. They are built once at import instead of on every call.
+if platform.system() == "Windows":
     import ctypes
     from ctypes import wintypes
 
-    # Address family constant for IPv4
-    # This filters results so Windows only returns IPv4 addresses.
-    AF_INET = 2
-
-    # Flag telling Windows to include prefix information (subnet data).
-    GAA_FLAG_INCLUDE_PREFIX = 0x0010
-
     # --- Low-level struct definitions ---
     #
     # These structs do NOT store data themselves.
@@ -62,7 +67,9 @@ def get_windows_adapters(win_buffer_size: int) -> list:
         ("Length", wintypes.ULONG),  # struct size / ABI versioning
         ("IfIndex", wintypes.DWORD),  # IPv4 interface index
         ("Next", ctypes.POINTER(IP_ADAPTER_ADDRESSES)),  # next adapter
-        ("AdapterName", ctypes.c_char_p),  # internal name (GUID-like)
+        # The two names are declared as raw pointers so reading the field
+        # does not decode them. WindowsAdapter decodes them on first use.
+        ("AdapterName", ctypes.c_void_p),  # char*, internal name (GUID-like)
         # These are not really needed but without them Windows crappy layout breaks
         # and returns unusable gibberish.
         ("FirstUnicastAddress", ctypes.POINTER(IP_ADAPTER_UNICAST_ADDRESS)),
@@ -71,87 +78,258 @@ def get_windows_adapters(win_buffer_size: int) -> list:
         ("FirstDnsServerAddress", ctypes.c_void_p),
         ("DnsSuffix", wintypes.LPWSTR),
         ("Description", wintypes.LPWSTR),
-        ("FriendlyName", wintypes.LPWSTR),  # human-readable name
+        ("FriendlyName", ctypes.c_void_p),  # wchar_t*, human-readable name
+        ("PhysicalAddress", ctypes.c_ubyte * 8),  # MAC, MAX_ADAPTER_ADDRESS_LENGTH
+        ("PhysicalAddressLength", wintypes.ULONG),
+        ("Flags", wintypes.ULONG),
+        ("Mtu", wintypes.ULONG),
+        ("IfType", wintypes.DWORD),  # IANA interface type
+        ("OperStatus", ctypes.c_int),  # IF_OPER_STATUS enum
     ]
 
+    # sockaddr_in as Windows lays it out, so the address bytes can be
+    # read in place instead of copying the whole sockaddr first.
+    #   sin_family: AF_INET = 2, host byte order
+    #   sin_port:   ignored
+    #   sin_addr:   IPv4 address, network byte order
+    class _SockaddrIn(ctypes.Structure):
+        _fields_ = [
+            ("family", ctypes.c_ushort),
+            ("port", ctypes.c_ushort),
+            ("addr", ctypes.c_ubyte * 4),
+            ("zero", ctypes.c_ubyte * 8),
+        ]
+
+    _SockaddrInPtr = ctypes.POINTER(_SockaddrIn)
+
     # --- Bind the Win32 API ---
     #
     # GetAdaptersAddresses lives in iphlpapi.dll and expects the caller
     # to manage memory, buffer size and pointer traversal.
     GetAdaptersAddresses = ctypes.windll.iphlpapi.GetAdaptersAddresses
+    GetAdaptersAddresses.restype = wintypes.ULONG
     GetAdaptersAddresses.argtypes = [
         wintypes.ULONG,  # Address family (AF_INET)
-        wintypes.ULONG,  # Flags (unused -> 0)
+        wintypes.ULONG,  # Flags (GAA_FLAG_*)
         ctypes.c_void_p,  # Reserved (must be NULL)
         ctypes.POINTER(IP_ADAPTER_ADDRESSES),  # Output buffer
         ctypes.POINTER(wintypes.ULONG),  # In/out buffer size
     ]
 
-    # Im going to be honest here. Allocating 1MB of buffer (the default setting) is not how
-    # this API is supposed to be used. In normal setups, 16KB is enough.
-    # However i just want to make sure that even if someone has 100 Virtual Adapters
-    # the buffer wont overflow. Plus 1MB of RAM in 2026 is really nothing.
-    # The reason for that is that its very possible for the enviroment to be a Hyper-V
-    # or something else that just naturally adds a lot of Network Adapters.
-    # Hate it all you want but performance wise its basically 0 overhead.
-    buf_len = wintypes.ULONG(win_buffer_size)
-    buf = ctypes.create_string_buffer(buf_len.value)
-
-    # Ask Windows to fill the buffer with adapter data
-    ret = GetAdaptersAddresses(
-        AF_INET,
-        GAA_FLAG_INCLUDE_PREFIX,
-        None,  # reserved
-        ctypes.cast(buf, ctypes.POINTER(IP_ADAPTER_ADDRESSES)),
-        ctypes.byref(buf_len),
+
+# Adapters that can never send a magic packet are left out of the list.
+IF_TYPE_SOFTWARE_LOOPBACK = 24
+IF_OPER_STATUS_UP = 1
+
+# First two bytes of an APIPA address, 169.254.0.0/16
+_APIPA_PREFIX = b"\xa9\xfe"
+
+# One adapter from a snapshot. friendly and name are decoded from the
+# snapshot buffer on first access, most lookups only ever read the IPs
+# or stop at the first adapter that matches. The buffer stays alive as
+# long as any adapter of the snapshot does.
+class WindowsAdapter:
+    __slots__ = (
+        "ifindex",  # interface index
+        "ips",  # list of IPv4 strings
+        "primary_ip",  # first non APIPA IPv4 or None
+        "_buf",
+        "_friendly_ptr",
+        "_name_ptr",
+        "_friendly",
+        "_name",
     )
 
-    # ERROR_BUFFER_OVERFLOW means even 1MB wasnt enough.
-    # At this point something is seriously wrong with the system.
-    if ret == 111:
+    def __init__(self, buf, friendly_ptr, name_ptr, ifindex, ips, primary_ip):
+        self.ifindex = ifindex
+        self.ips = ips
+        self.primary_ip = primary_ip
+        self._buf = buf
+        self._friendly_ptr = friendly_ptr
+        self._name_ptr = name_ptr
+        self._friendly = None
+        self._name = None
+
+    # Ethernet, WLAN, whatever
+    @property
+    def friendly(self) -> str:
+        if self._friendly is None:
+            ptr = self._friendly_ptr
+            self._friendly = ctypes.wstring_at(ptr) if ptr else ""
+        return self._friendly
+
+    # Internal GUID-like name
+    @property
+    def name(self) -> str:
+        if self._name is None:
+            ptr = self._name_ptr
+            self._name = ctypes.string_at(ptr).decode() if ptr else ""
+        return self._name
+
+
+# Adapters rarely change between two calls in the same wake_on_lan, so a
+# snapshot is reused for this many seconds instead of asking Windows again.
+ADAPTER_CACHE_TTL = 2.0
+
+_cached_adapters = None
+_cached_at = 0.0
+
+# (snapshot, owners, by_iface) built from the current snapshot, rebuilt
+# whenever get_windows_adapters hands out a new one
+_cached_index = None
+
+# Last buffer size GetAdaptersAddresses succeeded with, 0 until the
+# first call probes it.
+_buffer_size = 0
+_BUFFER_RETRIES = 4
+# Microsoft's recommended starting size, used if Windows reports none
+_BUFFER_MIN = 15000
+
+
+# Returns the adapter list from the last enumeration if it is younger
+# than ADAPTER_CACHE_TTL, otherwise enumerates again. The returned list
+# is shared between callers and must not be modified.
+def get_windows_adapters(win_buffer_size: int | None = None) -> list:
+    global _cached_adapters, _cached_at
+
+    now = time.monotonic()
+    if _cached_adapters is not None and now - _cached_at < ADAPTER_CACHE_TTL:
+        return _cached_adapters
+
+    _cached_adapters = _query_windows_adapters(win_buffer_size)
+    _cached_at = now
+    return _cached_adapters
+
+
+# Forgets the current snapshot and the index built from it, so the next
+# lookup enumerates the adapters again
+def clear_adapter_cache() -> None:
+    global _cached_adapters, _cached_index
+    _cached_adapters = None
+    _cached_index = None
+
+
+# One pass over the current snapshot, shared by every lookup until the
+# snapshot expires. Returns:
+#   owners:   {ip: [WindowsAdapter, ...]} in adapter order
+#   by_iface: {iface argument: (ip, ifindex)}, empty at first and filled
+#             by resolve_iface as names are looked up
+def get_adapter_index(win_buffer_size: int | None = None) -> tuple:
+    global _cached_index
+
+    adapters = get_windows_adapters(win_buffer_size)
+    if _cached_index is None or _cached_index[0] is not adapters:
+        owners = {}
+        for a in adapters:
+            for ip in a.ips:
+                owners.setdefault(ip, []).append(a)
+        _cached_index = (adapters, owners, {})
+    return _cached_index[1], _cached_index[2]
+
+
+# Use the horrific Win32 API to get a list of Windows network adapters.
+# This function asks Windows for a snapshot of all IPv4 adapters,
+# then manually walks several linked lists inside a raw memory blob.
+# I have gone trough the pain of commenting almost every line in here
+# just so anyone reading this code has a shot of understanding what is going on here.
+#
+# Just a funfact:
+# This entire Monster exists purely because Windows doesnt accept
+# interface names into sock.bind() directly unlike Unix. Gotta love it.
+def _query_windows_adapters(win_buffer_size: int | None) -> list:
+    global _buffer_size
+
+    # The buffer is sized by asking Windows. The first call passes the
+    # last size that worked (0 on the very first call) and on
+    # ERROR_BUFFER_OVERFLOW Windows writes the size it needs into
+    # buf_len. Adapters can appear between two calls, so the retry
+    # allocates at least double and gives up after a few rounds.
+    # Passing win_buffer_size skips the probe and starts from that size.
+    size = win_buffer_size or _buffer_size
+    for _ in range(_BUFFER_RETRIES):
+        buf_len = wintypes.ULONG(size)
+        buf = ctypes.create_string_buffer(size) if size else None
+
+        # Ask Windows to fill the buffer with adapter data
+        ret = GetAdaptersAddresses(
+            AF_INET,
+            GAA_FLAGS,
+            None,  # reserved
+            ctypes.cast(buf, ctypes.POINTER(IP_ADAPTER_ADDRESSES)) if buf else None,
+            ctypes.byref(buf_len),
+        )
+
+        # ERROR_BUFFER_OVERFLOW, grow and try again
+        if ret == 111:
+            size = max(buf_len.value, size * 2, _BUFFER_MIN)
+            continue
+        if ret != 0:
+            raise GetAdaptersAddressesError(ret)
+        break
+    else:
+        # Still overflowing after several rounds.
+        # At this point something is seriously wrong with the system.
         raise AdapterBufferOverflow()
-    elif ret != 0:
-        raise GetAdaptersAddressesError(ret)
+
+    # Remember the size so later calls allocate once
+    _buffer_size = size
 
     adapters = []
 
+    # Locals for the walk, every unicast node would otherwise repeat
+    # these global and attribute lookups
+    cast = ctypes.cast
+    inet_ntoa = socket.inet_ntoa
+    sockaddr_ptr = _SockaddrInPtr
+
     # p points to the FIRST adapter struct at the start of the buffer.
     # From here on, everything is pointer chasing.
-    p = ctypes.cast(buf, ctypes.POINTER(IP_ADAPTER_ADDRESSES))
+    p = cast(buf, ctypes.POINTER(IP_ADAPTER_ADDRESSES))
 
     # Walk the adapter linked list
     while p:
         a = p.contents
+
+        # Skip the loopback pseudo-interface and anything that is not up
+        # before reading a single address of it
+        if a.IfType == IF_TYPE_SOFTWARE_LOOPBACK or a.OperStatus != IF_OPER_STATUS_UP:
+            p = a.Next
+            continue
+
         ips = []
+        ips_append = ips.append
+        primary = None
 
         # Each adapter has a linked list of unicast IP addresses
         u = a.FirstUnicastAddress
         while u:
-            # Copy the raw sockaddr bytes into Python memory
-            raw = ctypes.string_at(
-                u.contents.Address.lpSockaddr, u.contents.Address.iSockaddrLength
-            )
+            # .contents builds a new wrapper object each time, take it once
+            uc = u.contents
 
-            # sockaddr_in layout (IPv4):
-            #   bytes 0-1: sin_family (AF_INET = 2)
-            #   bytes 2-3: port (ignored)
-            #   bytes 4-7: IPv4 address
-            #
-            # On little-endian Windows, raw[0] == AF_INET works reliably.
-            if raw and raw[0] == AF_INET:
-                ips.append(socket.inet_ntoa(raw[4:8]))
+            # View the sockaddr Windows wrote through _SockaddrIn, only
+            # the 4 address bytes end up copied into Python memory
+            lp = uc.Address.lpSockaddr
+            if lp:
+                sa = cast(lp, sockaddr_ptr).contents
+                if sa.family == AF_INET:
+                    raw = bytes(sa.addr)
+                    ip = inet_ntoa(raw)
+                    ips_append(ip)
+                    # 169.254.x.x is APIPA (Automatic Private IP Addressing).
+                    # Basically meaning that Windows screwed up to get an IP.
+                    # Checked on the raw bytes, no string prefix test needed.
+                    if primary is None and raw[:2] != _APIPA_PREFIX:
+                        primary = ip
 
             # Move to the next IP node
-            u = u.contents.Next
+            u = uc.Next
 
-        # Convert this adapter into a sane Python structure
+        # Convert this adapter into a sane Python structure. The names
+        # stay as pointers into buf until someone reads them.
         adapters.append(
-            {
-                "friendly": a.FriendlyName,  # Ethernet, WLAN, whatever
-                "name": a.AdapterName.decode() if a.AdapterName else "",
-                "ifindex": int(a.IfIndex),  # interface index
-                "ips": ips,  # list of IPv4 strings
-            }
+            WindowsAdapter(
+                buf, a.FriendlyName, a.AdapterName, int(a.IfIndex), ips, primary
+            )
         )
 
         # Move to next adapter node
@@ -1,13 +1,21 @@
 from .utils import (
     build_magic_packet,
+    parse_mac,
+    _magic_packet,
     resolve_iface,
     set_windows_unicast_if,
     get_ip_owners,
+    count_ip_owners,
 )
 import platform
 import socket
+from . import sendmmsg
 from .exceptions import DuplicateIPError, ResolveInterfaceError
 
+# The platform cannot change while running, decide it once at import
+_IS_WINDOWS = platform.system() == "Windows"
+_IS_LINUX = platform.system() == "Linux"
+
 
 # Sends a Wake-on-LAN (WoL) packet with optional control over
 # source IP and network interface.
@@ -17,7 +25,7 @@ def wake_on_lan(
     port=9,
     src_ip=None,
     iface=None,
-    win_buffer_size=1024 * 1024,
+    win_buffer_size=None,
 ):
     """
     Send a Wake-on-LAN (WoL) magic packet to a target device.
@@ -44,8 +52,10 @@ def wake_on_lan(
         Network interface name to send the packet through. If specified,
         it overrides src_ip and is resolved to the appropriate source
         address and (on Windows) interface index.
-    win_buffer : int, optional
-        How many bytes the string buffer for GetAdaptersAddresses should get.
+    win_buffer_size : int, optional
+        Initial size in bytes of the buffer for GetAdaptersAddresses. By
+        default the required size is asked from Windows and remembered.
+        The buffer grows automatically if it turns out too small.
 
     Raises
     ------
@@ -61,21 +71,142 @@ def wake_on_lan(
     """
     # Haha... magic
     magic = build_magic_packet(mac)
-    system = platform.system().lower()
 
-    # If a source IP is provided make sure it belongs to exactly one interface
-    if src_ip:
-        owners = get_ip_owners(win_buffer_size)
-        if src_ip in owners and len(owners[src_ip]) > 1:
-            raise DuplicateIPError(src_ip, owners[src_ip])
+    with WolSender(src_ip=src_ip, iface=iface, win_buffer_size=win_buffer_size) as s:
+        s.send_packet(magic, dest_ip, port)
+
+
+# Sends Wake-on-LAN packets to many devices through one socket.
+def wake_on_lan_many(
+    macs,
+    dest_ip="255.255.255.255",
+    port=9,
+    src_ip=None,
+    iface=None,
+    win_buffer_size=None,
+):
+    """
+    Send a Wake-on-LAN (WoL) magic packet to each of several devices.
+
+    Takes the same options as wake_on_lan, but every packet goes out
+    through a single socket. On Linux the packets are handed to the
+    kernel in batches with sendmmsg instead of one sendto per packet.
+
+    Parameters
+    ----------
+    macs : iterable of str
+        Target MAC addresses to wake. All of them are validated before
+        anything is sent.
+    dest_ip, port, src_ip, iface, win_buffer_size
+        See wake_on_lan. They apply to every packet.
+    """
+    raws = [parse_mac(mac) for mac in macs]
+    if not raws:
+        return
+
+    with WolSender(src_ip=src_ip, iface=iface, win_buffer_size=win_buffer_size) as s:
+        s._send_raw(raws, dest_ip, port)
+
+
+# Keeps one configured socket open so many packets can be sent without
+# paying for socket creation, setsockopt and bind on every call.
+class WolSender:
+    """
+    Reusable Wake-on-LAN sender holding one open UDP socket.
+
+    The socket is created and configured once when the context is
+    entered, the same way wake_on_lan configures it, and closed when
+    the context is left. Use it instead of wake_on_lan when sending
+    many packets over time.
+
+    Parameters
+    ----------
+    src_ip, iface, win_buffer_size
+        See wake_on_lan. They are applied once when the socket opens.
+
+    Examples
+    --------
+    >>> with WolSender(iface="eth0") as sender:
+    ...     sender.send("AA:BB:CC:DD:EE:FF")
+    ...     sender.send("11:22:33:44:55:66", dest_ip="192.168.1.255")
+    """
+
+    __slots__ = ("src_ip", "iface", "win_buffer_size", "sock")
+
+    def __init__(self, src_ip=None, iface=None, win_buffer_size=None):
+        self.src_ip = src_ip
+        self.iface = iface
+        self.win_buffer_size = win_buffer_size
+        self.sock = None
+
+    def open(self) -> None:
+        """Create and configure the socket if it is not open yet."""
+        if self.sock is None:
+            self.sock = _open_socket(self.src_ip, self.iface, self.win_buffer_size)
+
+    def close(self) -> None:
+        """Close the socket. Safe to call more than once."""
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+    def __enter__(self) -> "WolSender":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def send(self, mac, dest_ip="255.255.255.255", port=9) -> None:
+        """Send one magic packet for mac, see wake_on_lan for the arguments."""
+        self.send_packet(build_magic_packet(mac), dest_ip, port)
+
+    def send_many(self, macs, dest_ip="255.255.255.255", port=9) -> None:
+        """Send a magic packet for each of macs, see wake_on_lan_many."""
+        raws = [parse_mac(mac) for mac in macs]
+        if raws:
+            self._send_raw(raws, dest_ip, port)
+
+    # wake_on_lan and wake_on_lan_many build the packets first, so an
+    # invalid MAC is reported before any socket is opened
+    def send_packet(self, magic: bytes, dest_ip: str, port: int) -> None:
+        """Send an already built magic packet."""
+        self.open()
+        self.sock.sendto(magic, (dest_ip, port))
+
+    # raws are validated 6 byte MACs. On Linux sendmmsg builds the
+    # packets itself, elsewhere each one is built and sent on its own.
+    def _send_raw(self, raws: list, dest_ip: str, port: int) -> None:
+        self.open()
+        if _IS_LINUX and sendmmsg.available():
+            sendmmsg.send_magic_batch(self.sock, raws, dest_ip, port)
+        else:
+            # A host name is resolved once for the batch, not by every sendto
+            addr = (socket.gethostbyname(dest_ip), port)
+            sendto = self.sock.sendto
+            for raw in raws:
+                sendto(_magic_packet(raw), addr)
+
 
+# Creates the UDP socket used to send magic packets, configured for
+# broadcast and bound to the requested source IP or interface.
+def _open_socket(src_ip, iface, win_buffer_size) -> socket.socket:
     win_ifindex = None
     if iface:
+        # The interface decides the source IP, a src_ip passed alongside
+        # is replaced, so there is no point checking who owns it
         src_ip, win_ifindex = resolve_iface(iface, win_buffer_size)
         if not src_ip:
             raise ResolveInterfaceError(iface)
+    elif src_ip and count_ip_owners(src_ip, win_buffer_size) > 1:
+        # If a source IP is provided make sure it belongs to exactly one interface.
+        # The full owner list is only built for the error message.
+        raise DuplicateIPError(src_ip, get_ip_owners(win_buffer_size)[src_ip])
 
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
         # Bind source IP if explicitly requested
@@ -83,11 +214,14 @@ def wake_on_lan(
             sock.bind((src_ip, 0))
 
         # Unix-style interface binding
-        if iface and system == "linux":
+        if iface and _IS_LINUX:
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, iface.encode())
 
         # Windows-style interface binding
-        if win_ifindex is not None and system == "windows":
+        if win_ifindex is not None and _IS_WINDOWS:
             set_windows_unicast_if(sock, win_ifindex)
+    except BaseException:
+        sock.close()
+        raise
 
-        sock.sendto(magic, (dest_ip, port))
+    return sock
@@ -0,0 +1,33 @@
+import atexit
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# espu.core loads core/registry.json on import and fails if it is not
+# valid. The file is filled in by the build script, so the checked in
+# copy is empty. Run the tests against a copy of the source tree with a
+# registry listing the components under test instead of touching the
+# working tree.
+_SRC = Path(__file__).resolve().parent.parent / "src"
+
+_REGISTRY = {
+    "core": {"package": "espu", "kind": "core"},
+    "bezier": {"package": "espu-ext-bezier", "kind": "ext"},
+    "vector": {"package": "espu-lib-vector", "kind": "lib"},
+}
+
+_tmp = Path(tempfile.mkdtemp(prefix="espu-tests-"))
+atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+
+shutil.copytree(
+    _SRC / "espu",
+    _tmp / "espu",
+    ignore=shutil.ignore_patterns("__pycache__"),
+)
+(_tmp / "espu" / "core" / "registry.json").write_text(
+    json.dumps(_REGISTRY), encoding="utf-8"
+)
+
+sys.path.insert(0, str(_tmp))
@@ -0,0 +1,62 @@
+from bisect import bisect_left
+
+from espu.bezier import CubicBezierCurve
+from espu.lib.vector import Vec2
+
+
+# Control points on one line with the middle ones overshooting, so the
+# curve runs back on itself and its speed almost vanishes twice. The
+# Newton step in resolve_uniform used to jump far past the answer here.
+def _near_cusp_curve() -> CubicBezierCurve:
+    return CubicBezierCurve(Vec2(0, 0), Vec2(10, 0), Vec2(-5, 0), Vec2(1, 0))
+
+
+# Dense chord table (t, cumulative length) used as the reference
+def _reference_table(curve, steps=20000):
+    ts = [0.0]
+    ss = [0.0]
+    prev = curve.resolve(0.0)
+    length = 0.0
+    for i in range(1, steps + 1):
+        t = i / steps
+        p = curve.resolve(t)
+        length += ((p.x - prev.x) ** 2 + (p.y - prev.y) ** 2) ** 0.5
+        ts.append(t)
+        ss.append(length)
+        prev = p
+    return ts, ss
+
+
+def _reference_point(curve, ts, ss, u):
+    s = u * ss[-1]
+    i = min(max(bisect_left(ss, s), 1), len(ss) - 1)
+    t = ts[i - 1] + (s - ss[i - 1]) * (ts[i] - ts[i - 1]) / (ss[i] - ss[i - 1])
+    return curve.resolve(t)
+
+
+def test_resolve_uniform_near_cusp():
+    curve = _near_cusp_curve()
+    curve.bake()
+    ts, ss = _reference_table(curve)
+    total = ss[-1]
+
+    worst = 0.0
+    for k in range(401):
+        u = k / 400
+        p = curve.resolve_uniform(u)
+        q = _reference_point(curve, ts, ss, u)
+        worst = max(worst, abs(p.x - q.x) + abs(p.y - q.y))
+
+    assert worst < 0.005 * total
+
+
+def test_refined_step_stays_near_answer():
+    curve = _near_cusp_curve()
+    curve.bake()
+    ts, ss = _reference_table(curve)
+
+    # The unclamped step moved t from 0.823 to 0.919 here, the answer
+    # is about 0.831
+    p = curve.resolve_uniform(0.8375)
+    q = _reference_point(curve, ts, ss, 0.8375)
+    assert abs(p.x - q.x) < 0.005 * ss[-1]